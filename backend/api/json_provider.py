@@ -0,0 +1,45 @@
+"""
+JSON Provider
+orjson-backed JSON provider for the Flask app
+"""
+
+from typing import Any, Callable, Union
+
+import orjson
+from flask import Response, current_app
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Serialize with orjson, falling back to Flask's defaults for unsupported types"""
+
+    # Datetimes are passed through to Flask's default handler so responses keep
+    # the same HTTP-date format as the stdlib provider
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = self._OPTIONS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get('default', self.default), option=option).decode('utf-8')
+
+    def loads(self, s: Union[str, bytes], **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+
+def orjson_encoder() -> Callable[[Any], bytes]:
+    """Return a bytes encoder bound to the current app's fallback handler, usable after the request ends"""
+    default = current_app.json.default
+    return lambda obj: orjson.dumps(obj, default=default, option=OrjsonProvider._OPTIONS)
+
+
+def orjson_response(obj: Any, status: int = 200) -> Response:
+    """
+    Build a JSON response for large payloads, encoding straight to bytes.
+
+    Unlike jsonify this skips key sorting and the str round trip; unsupported
+    types (including datetimes) still go through the app provider's default.
+    """
+    return Response(orjson_encoder()(obj), status=status, mimetype='application/json')
@@ -7,19 +7,36 @@ import logging
 import os
 import base64
 import asyncio
+import hmac
+import stat
+import threading
 import time
-from flask import request, jsonify, Blueprint, Response, g
-from typing import Dict, Any, List, Optional
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import request, jsonify, Blueprint, Response, g, current_app
+from types import MappingProxyType
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Mapping, Optional, Tuple
 import json
+import orjson
+from urllib.parse import urlsplit
+from werkzeug.exceptions import HTTPException
+from cachetools import TTLCache
+from pydantic import TypeAdapter, ValidationError
 
-from models.firewall_rule import FirewallRule, AuditResult, CloudProvider, ComplianceResult
+from models.firewall_rule import FirewallRule, AuditResult, CloudProvider, ComplianceResult, NormalizedRule, RuleViolation
 from langgraph.agent import FirewallAuditAgent
 from langgraph.compliance_agent import ComplianceAgent
 from langgraph.terraform_agent import terraform_agent
 from normalization.engine import NormalizationEngine
 from caching.context_cache import ContextCache
 from caching.semantic_cache import SemanticCache
-from utils.terraform_parser import parse_terraform_content, parse_terraform_directory
+from utils.terraform_parser import canonicalize_hcl, dedupe_rules, parse_terraform_content, parse_terraform_directory_async
+from utils.dynamic_batcher import DynamicBatcher
+from api.json_provider import orjson_encoder, orjson_response
+from utils.concurrency import LoopLocalSemaphore, SingleFlight
+from utils.hashing import content_digest
 from tracking.analysis_tracker import get_tracker
 from config.model_config import get_model_manager
 from rag.knowledge_base import RAGKnowledgeBase
@@ -29,6 +46,204 @@ from telemetry.config import get_telemetry_config
 
 logger = logging.getLogger(__name__)
 
+_RULES_ADAPTER = TypeAdapter(List[FirewallRule])
+_NORMALIZED_RULE_ADAPTER = TypeAdapter(NormalizedRule)
+_VIOLATION_ADAPTER = TypeAdapter(RuleViolation)
+
+# Large audits are split into chunks that run concurrently, at most this many at a time
+_AUDIT_CHUNK_SIZE = 50
+_AUDIT_MAX_INFLIGHT = 4
+
+# Upper bound on sub-requests accepted by /api/v1/batch
+_BATCH_MAX_REQUESTS = 20
+
+# Process-wide caps on concurrent agent/engine calls across all requests
+_AUDIT_SEM = LoopLocalSemaphore(int(os.getenv('MAX_AUDIT_CONCURRENCY', '4')))
+_NORMALIZE_SEM = LoopLocalSemaphore(int(os.getenv('MAX_NORMALIZE_CONCURRENCY', '4')))
+
+# Identical audit/compliance requests arriving together share one agent run
+_AUDIT_FLIGHTS = SingleFlight()
+_COMPLIANCE_FLIGHTS = SingleFlight()
+
+# GCP connectivity probes for /health/services block on RPCs; run them side by side
+_PROBE_EXEC = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-probe')
+_SERVICE_PROBE_TIMEOUT = 3.0
+
+
+# Probe clients are built on first use and reused, so each keeps its gRPC channel / HTTP
+# session (and TLS handshake) across probes; a failed construction is retried next probe
+@lru_cache(maxsize=1)
+def _firestore_client() -> Any:
+    from google.cloud import firestore
+    return firestore.Client()
+
+
+@lru_cache(maxsize=1)
+def _storage_client() -> Any:
+    from google.cloud import storage
+    return storage.Client()
+
+
+@lru_cache(maxsize=1)
+def _secrets_client() -> Any:
+    from google.cloud import secretmanager
+    return secretmanager.SecretManagerServiceClient()
+
+
+@lru_cache(maxsize=4)
+def _vertex_llm(project_id: str) -> Any:
+    from langchain_google_vertexai import ChatVertexAI
+    return ChatVertexAI(
+        model="gemini-1.5-flash",
+        project=project_id,
+        temperature=0
+    )
+
+# Tracker/telemetry writes run here so they stay off the request's critical path
+_TRACKING_EXEC = ThreadPoolExecutor(max_workers=4, thread_name_prefix='tracking')
+_TRACKING_MAX_PENDING = 256
+_tracking_pending: 'deque[Future]' = deque()
+_tracking_lock = threading.Lock()
+_tracking_dropped = 0
+
+
+def _track_in_background(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> None:
+    """Fire-and-forget a tracking call; drops it when the backlog is full rather than blocking the caller"""
+    global _tracking_dropped
+    with _tracking_lock:
+        while _tracking_pending and _tracking_pending[0].done():
+            _tracking_pending.popleft()
+        if len(_tracking_pending) >= _TRACKING_MAX_PENDING:
+            # Callers include async views on the shared event loop, which must never wait on telemetry
+            _tracking_dropped += 1
+            dropped = _tracking_dropped
+        else:
+            dropped = 0
+    if dropped:
+        if dropped % 100 == 1:
+            logger.warning("Tracking backlog full; dropped %s (%d dropped so far)", getattr(fn, '__name__', fn), dropped)
+        return
+
+    def run() -> None:
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            logger.error("Background tracking call %s failed: %s", getattr(fn, '__name__', fn), e)
+
+    future = _TRACKING_EXEC.submit(run)
+    with _tracking_lock:
+        _tracking_pending.append(future)
+
+
+# Shared by every request, so exposed read-only
+_PROVIDER_DESCRIPTIONS: Mapping[CloudProvider, str] = MappingProxyType({
+    CloudProvider.GCP: "Google Cloud Platform - VPC Firewalls, Cloud Armor",
+    CloudProvider.AZURE: "Microsoft Azure - Network Security Groups, Azure Firewall",
+    CloudProvider.AVIATRIX: "Aviatrix Distributed Cloud Firewall - SmartGroups, WebGroups",
+    CloudProvider.CISCO: "Cisco ASA - Access Control Lists",
+    CloudProvider.PALO_ALTO: "Palo Alto Networks - Security Policies"
+})
+
+
+def get_provider_description(provider: CloudProvider) -> str:
+    """Get description for a cloud provider"""
+    return _PROVIDER_DESCRIPTIONS.get(provider, "Firewall rules")
+
+
+# Request payloads name providers by id; resolve them with a dict lookup
+_PROVIDERS_BY_ID = {provider.value: provider for provider in CloudProvider}
+
+
+# Provider metadata is static, so the /providers body is encoded once at import
+_SUPPORTED_PROVIDERS = (CloudProvider.AVIATRIX,)
+_SUPPORTED_PROVIDER_IDS = tuple(provider.value for provider in _SUPPORTED_PROVIDERS)
+_PROVIDERS_BODY = orjson.dumps({
+    'success': True,
+    'providers': [
+        {
+            'id': provider.value,
+            'name': provider.value.upper(),
+            'description': get_provider_description(provider)
+        }
+        for provider in _SUPPORTED_PROVIDERS
+    ]
+}, option=orjson.OPT_SORT_KEYS)
+
+
+def _validate_rules(rules_data: Any) -> Tuple[List[FirewallRule], List[Any]]:
+    """
+    Validate a list of rule dicts in one pass, dropping and logging invalid entries.
+
+    Returns the validated rules along with the raw entries they came from, so
+    callers can derive cache keys from the parsed input instead of re-dumping
+    the models.
+    """
+    try:
+        return _RULES_ADAPTER.validate_python(rules_data), rules_data
+    except ValidationError as e:
+        invalid = set()
+        for error in e.errors():
+            loc = error.get('loc') or ()
+            if not loc or not isinstance(loc[0], int):
+                logger.warning("Invalid rules payload: %s", error.get('msg'))
+                return [], []
+            invalid.add(loc[0])
+            logger.warning("Invalid rule data at index %s: %s (%s)", loc[0], error.get('msg'), '.'.join(map(str, loc[1:])))
+        valid = [rule_data for i, rule_data in enumerate(rules_data) if i not in invalid]
+        return _RULES_ADAPTER.validate_python(valid), valid
+
+
+def _merge_audit_results(results: List[AuditResult]) -> AuditResult:
+    """Combine per-chunk audit results into a single result"""
+    if len(results) == 1:
+        return results[0]
+
+    first = results[0]
+    violations = [v for result in results for v in result.violations]
+    recommendations = [r for result in results for r in result.recommendations_list]
+    return first.model_copy(update={
+        'total_rules': sum(result.total_rules for result in results),
+        'violations_found': len(violations),
+        'recommendations': len(recommendations),
+        'violations': violations,
+        'recommendations_list': recommendations,
+        'summary': {**first.summary, 'chunks': len(results)},
+        'execution_time_seconds': max(result.execution_time_seconds for result in results),
+        'cached': all(result.cached for result in results),
+        'confidence_score': min(result.confidence_score for result in results),
+        'similar_issues': [issue for result in results for issue in result.similar_issues],
+        'terraform_diff': next((result.terraform_diff for result in results if result.terraform_diff), None)
+    })
+
+
+def _iter_json_object(
+    fields: Dict[str, Any],
+    key: str,
+    items: Iterable[Any],
+    encode: Optional[Callable[[Any], bytes]] = None
+) -> Iterator[bytes]:
+    """
+    Encode ``{**fields, key: [...items]}`` incrementally, one list item at a time.
+
+    Items are encoded with ``encode`` when given, otherwise with the app's JSON
+    provider. The encoder is bound eagerly, so the returned iterator can be
+    consumed after the request context is gone (async views cannot use
+    stream_with_context).
+    """
+    dumps = current_app.json.dumps
+    if encode is None:
+        encode = lambda item: dumps(item).encode('utf-8')
+
+    def generate() -> Iterator[bytes]:
+        head = dumps(fields)[:-1]
+        yield f'{head}{"," if fields else ""}{dumps(key)}:['.encode('utf-8')
+        for i, item in enumerate(items):
+            yield b',' + encode(item) if i else encode(item)
+        yield b']}'
+
+    return generate()
+
+
 def register_routes(
     app,
     audit_agent: FirewallAuditAgent,
@@ -42,15 +257,17 @@ def register_routes(
     """Register all API routes"""
 
     api = Blueprint('api', __name__)
+    # Endpoints reachable without Basic auth; kept off the api blueprint's auth hook
+    public_api = Blueprint('public_api', __name__)
     
-    # Verify imports work
-    try:
-        from config.model_config import get_model_manager
-        from tracking.analysis_tracker import get_tracker
-        logger.info("Model config and tracking imports successful")
-    except Exception as e:
-        logger.error(f"Failed to import model config or tracker: {e}", exc_info=True)
-        # Continue anyway - routes will fail gracefully
+    # Process-wide singletons, resolved once instead of on every request
+    telemetry = get_telemetry_collector()
+    tracker = get_tracker()
+    model_manager = get_model_manager()
+    # The ingester holds no per-request state, so one instance serves every upload
+    ingester = DocumentIngester()
+    # Per-rule normalization results get their own cache so large batches never evict audit results
+    normalized_rule_cache = ContextCache(max_size=int(os.getenv('NORMALIZED_RULE_CACHE_SIZE', '5000')))
 
     def _unauthorized():
         return Response(
@@ -59,6 +276,19 @@ def register_routes(
             {'WWW-Authenticate': 'Basic realm="Firewall AI"'}
         )
 
+    # Admin credentials are read once at registration; re-register to pick up changes
+    admin_username = os.getenv('ADMIN_USERNAME', 'admin')
+    admin_password = os.getenv('ADMIN_PASSWORD', 'admin')
+    admin_user = type('User', (), {
+        'username': admin_username,
+        'email': f"{admin_username}@firewall-ai.local",
+        'role': 'admin',
+        'user_id': 'admin'
+    })()
+    # Compare the whole header against the expected value instead of decoding
+    # and splitting every request's credentials
+    expected_header = 'Basic ' + base64.b64encode(f"{admin_username}:{admin_password}".encode('utf-8')).decode('ascii')
+
     def _is_authorized() -> bool:
         """Check if request is authorized using admin credentials from environment variables"""
         auth_header = request.headers.get('Authorization', '')
@@ -66,33 +296,15 @@ def register_routes(
             logger.debug("No Basic auth header found")
             return False
         try:
-            encoded = auth_header.split(' ', 1)[1]
-            decoded = base64.b64decode(encoded).decode('utf-8')
-            username, password = decoded.split(':', 1)
-            logger.debug(f"Attempting to authenticate user: {username}")
-            
-            # Check against environment variables
-            admin_username = os.getenv('ADMIN_USERNAME', 'admin')
-            admin_password = os.getenv('ADMIN_PASSWORD', 'admin')
-            
-            logger.debug(f"Comparing: username='{username}' vs '{admin_username}', password='{password[:3]}...' vs '{admin_password[:3]}...'")
-            
-            if username == admin_username and password == admin_password:
-                # Store admin user info in g object
-                g.current_user = type('User', (), {
-                    'username': admin_username,
-                    'email': f"{admin_username}@firewall-ai.local",
-                    'role': 'admin',
-                    'user_id': 'admin'
-                })()
-                logger.info(f"Admin user {username} authenticated successfully")
-                return True
-            
-            logger.debug(f"Authentication failed for user: {username}")
-            return False
-        except Exception as e:
-            logger.error(f"Authentication error: {e}", exc_info=True)
+            matched = hmac.compare_digest(auth_header, expected_header)
+        except TypeError:
+            # compare_digest rejects non-ASCII str, which can never match anyway
+            matched = False
+        if not matched:
             return False
+        # Store admin user info in g object
+        g.current_user = admin_user
+        return True
     
     def _require_admin() -> Optional[Response]:
         """Require admin role - all authenticated users are admin"""
@@ -104,26 +316,18 @@ def register_routes(
     @api.before_request
     def require_basic_auth():
         try:
-            open_paths = {
-                '/api/v1/health', 
-                '/api/v1/health/services', 
-                '/api/v1/auth/login'
-            }
-            if request.path in open_paths:
-                return None
-            
-            logger.debug(f"Authenticating request to {request.path}")
+            logger.debug("Authenticating request to %s", request.path)
             auth_result = _is_authorized()
             if not auth_result:
-                logger.warning(f"Authentication failed for {request.path}")
+                logger.warning("Authentication failed for %s", request.path)
                 return _unauthorized()
-            logger.debug(f"Authentication successful for {request.path}")
+            logger.debug("Authentication successful for %s", request.path)
             return None
         except Exception as e:
             logger.error(f"Error in before_request for {request.path}: {e}", exc_info=True)
             return jsonify({'error': 'Internal server error', 'details': str(e)}), 500
 
-    @api.route('/api/v1/auth/login', methods=['POST'])
+    @public_api.route('/api/v1/auth/login', methods=['POST'])
     def login():
         """Login endpoint"""
         if not _is_authorized():
@@ -183,10 +387,11 @@ def register_routes(
         """Audit firewall rules endpoint"""
         
         # Track telemetry
-        telemetry = get_telemetry_collector()
-        data = request.get_json() or {}
-        telemetry.track_user_action('audit_firewall_rules', {
-            'rules_count': len(data.get('rules', [])),
+        data = request.get_json(silent=True) or {}
+        rules_data = data.get('rules', [])
+        rules_count = len(rules_data) if isinstance(rules_data, list) else 0
+        _track_in_background(telemetry.track_user_action, 'audit_firewall_rules', {
+            'rules_count': rules_count,
             'cloud_provider': data.get('cloud_provider', 'gcp')
         })
 
@@ -195,25 +400,24 @@ def register_routes(
                 return jsonify({'error': 'No data provided'}), 400
 
             # Extract parameters
-            rules_data = data.get('rules', [])
             intent = data.get('intent', '')
             cloud_provider = data.get('cloud_provider', 'aviatrix')
 
-            if not rules_data:
+            if not rules_count:
                 return jsonify({'error': 'No rules provided'}), 400
 
             if not intent:
                 return jsonify({'error': 'No security intent provided'}), 400
 
+            try:
+                chunk_size = int(data.get('chunk_size', _AUDIT_CHUNK_SIZE))
+            except (TypeError, ValueError):
+                return jsonify({'error': 'chunk_size must be an integer'}), 400
+            if chunk_size < 1:
+                return jsonify({'error': 'chunk_size must be positive'}), 400
+
             # Convert to FirewallRule objects
-            rules = []
-            for rule_data in rules_data:
-                try:
-                    rule = FirewallRule(**rule_data)
-                    rules.append(rule)
-                except Exception as e:
-                    logger.warning(f"Invalid rule data: {e}")
-                    continue
+            rules, rules_source = _validate_rules(rules_data)
 
             if not rules:
                 return jsonify({'error': 'No valid rules found'}), 400
@@ -224,12 +428,24 @@ def register_routes(
             error_message = None
             
             try:
-                result = await audit_agent.audit_firewall_rules(rules, intent)
+                async def run_audit() -> AuditResult:
+                    chunks = [rules[i:i + chunk_size] for i in range(0, len(rules), chunk_size)]
+                    inflight = asyncio.Semaphore(_AUDIT_MAX_INFLIGHT)
+
+                    async def audit_chunk(chunk: List[FirewallRule]) -> AuditResult:
+                        async with inflight, _AUDIT_SEM:
+                            return await audit_agent.audit_firewall_rules(chunk, intent)
+
+                    chunk_results = await asyncio.gather(*(audit_chunk(chunk) for chunk in chunks))
+                    return _merge_audit_results(list(chunk_results))
+
+                audit_key = content_digest(orjson.dumps([rules_source, intent, chunk_size], option=orjson.OPT_SORT_KEYS))
+                result = await _AUDIT_FLIGHTS.run(audit_key, run_audit)
                 execution_time = time.time() - start_time
                 
-                # Track successful analysis
-                tracker = get_tracker()
-                tracker.track_analysis(
+                # Track successful analysis and telemetry without waiting on the writes
+                _track_in_background(
+                    tracker.track_analysis,
                     rule_count=len(rules),
                     intent=intent,
                     cloud_provider=cloud_provider,
@@ -239,26 +455,36 @@ def register_routes(
                     cached=result.cached,
                     success=True
                 )
+                _track_in_background(
+                    telemetry.track_performance,
+                    'audit_execution_time',
+                    execution_time,
+                    {'rule_count': len(rules), 'cached': result.cached}
+                )
                 
-                # Track telemetry
-                telemetry = get_telemetry_collector()
-                telemetry.track_performance('audit_execution_time', execution_time, {
-                    'rule_count': len(rules),
-                    'cached': result.cached
-                })
-                
-                return jsonify({
-                    'success': True,
-                    'audit_id': result.id,
-                    'result': result.dict()
-                })
+                # Stream the violations list, the bulk of large audit results,
+                # serializing each violation straight to JSON bytes
+                dumps = current_app.json.dumps
+                result_body = _iter_json_object(
+                    result.model_dump(exclude={'violations'}),
+                    'violations',
+                    result.violations,
+                    encode=_VIOLATION_ADAPTER.dump_json
+                )
+
+                def generate_audit_body() -> Iterator[bytes]:
+                    yield f'{{"audit_id":{dumps(result.id)},"result":'.encode('utf-8')
+                    yield from result_body
+                    yield b',"success":true}'
+
+                return Response(generate_audit_body(), mimetype='application/json')
             except Exception as audit_error:
                 execution_time = time.time() - start_time
                 error_message = str(audit_error)
                 
                 # Track failed analysis
-                tracker = get_tracker()
-                tracker.track_analysis(
+                _track_in_background(
+                    tracker.track_analysis,
                     rule_count=len(rules),
                     intent=intent,
                     cloud_provider=cloud_provider,
@@ -271,17 +497,16 @@ def register_routes(
                 )
                 
                 # Track telemetry error
-                telemetry = get_telemetry_collector()
-                telemetry.track_error('audit_failed', {
+                _track_in_background(telemetry.track_error, 'audit_failed', {
                     'error': error_message,
                     'rule_count': len(rules)
                 })
                 
-                logger.error(f"Audit failed: {error_message}")
+                logger.exception("Audit failed")
                 return jsonify({'error': 'Audit failed', 'details': error_message}), 500
 
         except Exception as e:
-            logger.error(f"Audit failed: {e}")
+            logger.exception("Audit failed")
             return jsonify({'error': 'Audit failed', 'details': str(e)}), 500
 
     @api.route('/api/v1/rules/normalize', methods=['POST'])
@@ -289,58 +514,81 @@ def register_routes(
         """Normalize firewall rules endpoint"""
         
         # Track telemetry
-        telemetry = get_telemetry_collector()
-        data = request.get_json() or {}
-        telemetry.track_user_action('normalize_rules', {
-            'rules_count': len(data.get('rules', []))
+        data = request.get_json(silent=True) or {}
+        rules_data = data.get('rules', [])
+        rules_count = len(rules_data) if isinstance(rules_data, list) else 0
+        _track_in_background(telemetry.track_user_action, 'normalize_rules', {
+            'rules_count': rules_count
         })
 
         try:
             if not data or 'rules' not in data:
                 return jsonify({'error': 'No rules provided'}), 400
 
-            rules_data = data['rules']
-            rules = []
-
-            for rule_data in rules_data:
-                try:
-                    rule = FirewallRule(**rule_data)
-                    rules.append(rule)
-                except Exception as e:
-                    logger.warning(f"Invalid rule data: {e}")
-                    continue
-
-            # Normalize rules
-            normalized_rules = await normalization_engine.normalize_rules_batch(rules)
-
-            return jsonify({
-                'success': True,
-                'normalized_rules': [rule.dict() for rule in normalized_rules]
-            })
+            rules, rules_source = _validate_rules(rules_data)
+
+            # Normalize only rules not seen before; duplicates share one engine call
+            keys = [
+                f"normalized_rule:{content_digest(orjson.dumps(rule_data, option=orjson.OPT_SORT_KEYS))}"
+                for rule_data in rules_source
+            ]
+            cached_rules = await normalized_rule_cache.mget(keys)
+            misses: Dict[str, FirewallRule] = {}
+            for key, rule, cached in zip(keys, rules, cached_rules):
+                if cached is None:
+                    misses.setdefault(key, rule)
+
+            fresh: Dict[str, Any] = {}
+            if misses:
+                async with _NORMALIZE_SEM:
+                    normalized = await normalization_engine.normalize_rules_batch(list(misses.values()))
+                fresh = dict(zip(misses, normalized))
+                await normalized_rule_cache.mset(fresh)
+
+            # Cached results carry the time of their first normalization; report this request's instead
+            now = datetime.utcnow()
+            normalized_rules = [
+                cached.model_copy(update={'normalization_timestamp': now}) if cached is not None else fresh[key]
+                for key, cached in zip(keys, cached_rules)
+            ]
+
+            # Stream the array so large batches are never encoded in one buffer. Rules are
+            # dumped to Python objects and encoded by the app's encoder, so the timestamp
+            # keeps the HTTP-date format every other endpoint uses
+            encode = orjson_encoder()
+            body = _iter_json_object(
+                {'success': True},
+                'normalized_rules',
+                normalized_rules,
+                encode=lambda rule: encode(_NORMALIZED_RULE_ADAPTER.dump_python(rule))
+            )
+            return Response(body, mimetype='application/json')
 
         except Exception as e:
             logger.error(f"Normalization failed: {e}")
-            telemetry.track_error('normalize_failed', {'error': str(e)})
+            _track_in_background(telemetry.track_error, 'normalize_failed', {'error': str(e)})
             return jsonify({'error': 'Normalization failed', 'details': str(e)}), 500
 
     @api.route('/api/v1/cache/stats', methods=['GET'])
-    def get_cache_stats():
+    async def get_cache_stats():
         """Get cache statistics"""
 
-        def run_async(coro):
-            try:
-                return asyncio.run(coro)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                try:
-                    asyncio.set_event_loop(loop)
-                    return loop.run_until_complete(coro)
-                finally:
-                    loop.close()
-
         try:
-            context_stats = run_async(context_cache.get_stats())
-            semantic_stats = run_async(semantic_cache.get_stats())
+            context_stats, semantic_stats = await asyncio.gather(
+                context_cache.get_stats(),
+                semantic_cache.get_stats(),
+                return_exceptions=True
+            )
+
+            # Report whichever cache answered; fail only if both did not
+            if isinstance(context_stats, Exception) and isinstance(semantic_stats, Exception):
+                raise context_stats
+            if isinstance(context_stats, Exception):
+                logger.warning("Failed to get context cache stats: %s", context_stats)
+                context_stats = {'error': str(context_stats)}
+            if isinstance(semantic_stats, Exception):
+                logger.warning("Failed to get semantic cache stats: %s", semantic_stats)
+                semantic_stats = {'error': str(semantic_stats)}
 
             return jsonify({
                 'success': True,
@@ -353,22 +601,11 @@ def register_routes(
             return jsonify({'error': 'Failed to get cache stats', 'details': str(e)}), 500
 
     @api.route('/api/v1/cache/clear', methods=['POST'])
-    def clear_cache():
+    async def clear_cache():
         """Clear all caches"""
 
-        def run_async(coro):
-            try:
-                return asyncio.run(coro)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                try:
-                    asyncio.set_event_loop(loop)
-                    return loop.run_until_complete(coro)
-                finally:
-                    loop.close()
-
         try:
-            run_async(context_cache.clear())
+            await context_cache.clear()
             # Note: Semantic cache clearing would be implemented if needed
 
             return jsonify({
@@ -386,7 +623,6 @@ def register_routes(
         
         try:
             hours = request.args.get('hours', 24, type=int)
-            tracker = get_tracker()
             stats = tracker.get_stats(hours=hours)
             
             return jsonify({
@@ -404,12 +640,11 @@ def register_routes(
         
         try:
             logger.info("get_models endpoint called")
-            model_manager = get_model_manager()
             logger.debug("Model manager retrieved")
             current_model = model_manager.get_current_model()
             logger.debug("Current model retrieved")
             available_models = model_manager.get_available_models()
-            logger.debug(f"Retrieved models: current={current_model.model_id if current_model else None}, available={len(available_models)}")
+            logger.debug("Retrieved models: current=%s, available=%d", current_model.model_id if current_model else None, len(available_models))
             
             response_data = {
                 'success': True,
@@ -438,7 +673,6 @@ def register_routes(
                 return jsonify({'error': 'No model_id provided'}), 400
             
             model_id = data['model_id']
-            model_manager = get_model_manager()
             
             # Check if model exists and is available
             model_config = model_manager.get_model_config(model_id)
@@ -477,7 +711,7 @@ def register_routes(
             documents = rag_knowledge_base.get_documents()
             stats = rag_knowledge_base.get_stats()
             
-            return jsonify({
+            return orjson_response({
                 'success': True,
                 'documents': documents,
                 'stats': stats
@@ -539,37 +773,23 @@ def register_routes(
             if file.filename == '':
                 return jsonify({'error': 'No file selected'}), 400
             
-            # Save uploaded file temporarily
-            import tempfile
-            import os
-            with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp_file:
-                file.save(tmp_file.name)
-                tmp_path = tmp_file.name
+            # Ingest straight from the upload stream
+            title, content, metadata = ingester.ingest_stream(file.stream, file.filename, title)
             
-            try:
-                # Ingest the file
-                ingester = DocumentIngester()
-                title, content, metadata = ingester.ingest_file(tmp_path, title)
-                
-                # Add to knowledge base
-                document_id = rag_knowledge_base.add_document(
-                    source=file.filename,
-                    source_type='file',
-                    title=title,
-                    content=content,
-                    metadata=metadata
-                )
-                
-                return jsonify({
-                    'success': True,
-                    'document_id': document_id,
-                    'message': f'Document uploaded successfully'
-                })
+            # Add to knowledge base
+            document_id = rag_knowledge_base.add_document(
+                source=file.filename,
+                source_type='file',
+                title=title,
+                content=content,
+                metadata=metadata
+            )
             
-            finally:
-                # Clean up temp file
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+            return jsonify({
+                'success': True,
+                'document_id': document_id,
+                'message': f'Document uploaded successfully'
+            })
         
         except Exception as e:
             logger.error(f"Failed to upload document: {e}")
@@ -589,7 +809,6 @@ def register_routes(
             title = data.get('title', None)
             
             # Ingest from URL
-            ingester = DocumentIngester()
             title, content, metadata = ingester.ingest_url(url, title)
             
             # Add to knowledge base
@@ -628,7 +847,7 @@ def register_routes(
             # Search knowledge base
             results = rag_knowledge_base.search(query, limit=limit, min_score=min_score)
             
-            return jsonify({
+            return orjson_response({
                 'success': True,
                 'results': results,
                 'count': len(results)
@@ -659,10 +878,11 @@ def register_routes(
         """Check firewall rules for compliance with industry standards"""
         
         # Track telemetry
-        telemetry = get_telemetry_collector()
-        data = request.get_json() or {}
-        telemetry.track_user_action('check_compliance', {
-            'rules_count': len(data.get('rules', [])),
+        data = request.get_json(silent=True) or {}
+        rules_data = data.get('rules', [])
+        rules_count = len(rules_data) if isinstance(rules_data, list) else 0
+        _track_in_background(telemetry.track_user_action, 'check_compliance', {
+            'rules_count': rules_count,
             'cloud_provider': data.get('cloud_provider', 'gcp')
         })
 
@@ -671,29 +891,20 @@ def register_routes(
                 return jsonify({'error': 'No data provided'}), 400
 
             # Extract parameters
-            rules_data = data.get('rules', [])
             cloud_provider_str = data.get('cloud_provider', 'gcp')
             standards = data.get('standards')  # Optional list of specific standards
             use_rag = data.get('use_rag', True)  # Use RAG by default
 
-            if not rules_data:
+            if not rules_count:
                 return jsonify({'error': 'No rules provided'}), 400
 
             # Convert cloud provider string to enum
-            try:
-                cloud_provider = CloudProvider(cloud_provider_str.lower())
-            except ValueError:
+            cloud_provider = _PROVIDERS_BY_ID.get(cloud_provider_str.lower())
+            if cloud_provider is None:
                 return jsonify({'error': f'Invalid cloud provider: {cloud_provider_str}'}), 400
 
             # Convert to FirewallRule objects
-            rules = []
-            for rule_data in rules_data:
-                try:
-                    rule = FirewallRule(**rule_data)
-                    rules.append(rule)
-                except Exception as e:
-                    logger.warning(f"Invalid rule data: {e}")
-                    continue
+            rules, rules_source = _validate_rules(rules_data)
 
             if not rules:
                 return jsonify({'error': 'No valid rules found'}), 400
@@ -704,22 +915,29 @@ def register_routes(
             error_message = None
             
             try:
-                result = await compliance_agent.check_compliance(
-                    rules=rules,
-                    cloud_provider=cloud_provider,
-                    standards=standards,
-                    use_rag=use_rag
+                compliance_key = content_digest(orjson.dumps(
+                    [rules_source, cloud_provider.value, standards, use_rag],
+                    option=orjson.OPT_SORT_KEYS
+                ))
+                result = await _COMPLIANCE_FLIGHTS.run(
+                    compliance_key,
+                    lambda: compliance_agent.check_compliance(
+                        rules=rules,
+                        cloud_provider=cloud_provider,
+                        standards=standards,
+                        use_rag=use_rag
+                    )
                 )
                 execution_time = time.time() - start_time
                 
                 # Track telemetry
-                telemetry.track_performance('compliance_check_time', execution_time, {
+                _track_in_background(telemetry.track_performance, 'compliance_check_time', execution_time, {
                     'rule_count': len(rules),
                     'standards_checked': len(result.standards_checked),
                     'rag_used': result.rag_context_used
                 })
                 
-                return jsonify({
+                return orjson_response({
                     'success': True,
                     'compliance_id': result.id,
                     'result': result.dict()
@@ -729,7 +947,7 @@ def register_routes(
                 error_message = str(compliance_error)
                 
                 # Track telemetry error
-                telemetry.track_error('compliance_check_failed', {
+                _track_in_background(telemetry.track_error, 'compliance_check_failed', {
                     'error': error_message,
                     'rule_count': len(rules)
                 })
@@ -743,7 +961,7 @@ def register_routes(
 
         except Exception as e:
             logger.error(f"Compliance check endpoint error: {e}")
-            telemetry.track_error('compliance_endpoint_error', {'error': str(e)})
+            _track_in_background(telemetry.track_error, 'compliance_endpoint_error', {'error': str(e)})
             return jsonify({'error': 'Failed to check compliance', 'details': str(e)}), 500
 
     @api.route('/api/v1/telemetry/config', methods=['GET'])
@@ -782,9 +1000,9 @@ def register_routes(
                     try:
                         from telemetry import _reset_collector
                         _reset_collector()
-                        logger.info(f"Telemetry collector reset due to OpenTelemetry config change: {use_opentelemetry}")
+                        logger.info("Telemetry collector reset due to OpenTelemetry config change: %s", use_opentelemetry)
                     except Exception as e:
-                        logger.warning(f"Failed to reset collector: {e}")
+                        logger.warning("Failed to reset collector: %s", e)
             
             return jsonify({
                 'success': True,
@@ -800,23 +1018,30 @@ def register_routes(
         """Get telemetry events"""
         
         try:
-            collector = get_telemetry_collector()
-            
             event_type = request.args.get('event_type')
             hours = int(request.args.get('hours', 24))
             limit = int(request.args.get('limit', 1000))
             
-            events = collector.get_events(
+            events = telemetry.iter_events(
                 event_type=event_type,
                 hours=hours,
                 limit=limit
             )
+            encode = orjson_encoder()
             
-            return jsonify({
-                'success': True,
-                'events': events,
-                'count': len(events)
-            })
+            # Stream events one at a time; NDJSON on request, otherwise the usual JSON object
+            if request.accept_mimetypes.best_match(['application/json', 'application/x-ndjson']) == 'application/x-ndjson':
+                return Response((encode(event) + b'\n' for event in events), mimetype='application/x-ndjson')
+            
+            def generate() -> Iterator[bytes]:
+                yield b'{"success":true,"events":['
+                count = 0
+                for event in events:
+                    yield b',' + encode(event) if count else encode(event)
+                    count += 1
+                yield b'],"count":%d}' % count
+            
+            return Response(generate(), mimetype='application/json')
         except Exception as e:
             logger.error(f"Failed to get telemetry events: {e}", exc_info=True)
             return jsonify({'error': 'Failed to get telemetry events', 'details': str(e)}), 500
@@ -826,10 +1051,9 @@ def register_routes(
         """Get telemetry statistics"""
         
         try:
-            collector = get_telemetry_collector()
             hours = int(request.args.get('hours', 24))
             
-            stats = collector.get_stats(hours=hours)
+            stats = telemetry.get_stats(hours=hours)
             
             return jsonify({
                 'success': True,
@@ -844,8 +1068,7 @@ def register_routes(
         """Clear all telemetry events"""
         
         try:
-            collector = get_telemetry_collector()
-            count = collector.clear_events()
+            count = telemetry.clear_events()
             
             return jsonify({
                 'success': True,
@@ -910,19 +1133,14 @@ def register_routes(
     @api.route('/api/v1/providers', methods=['GET'])
     def get_supported_providers():
         """Get list of supported cloud providers"""
+        return Response(_PROVIDERS_BODY, mimetype='application/json')
 
-        providers = [
-            {
-                'id': CloudProvider.AVIATRIX.value,
-                'name': CloudProvider.AVIATRIX.value.upper(),
-                'description': get_provider_description(CloudProvider.AVIATRIX)
-            }
-        ]
-
-        return jsonify({
-            'success': True,
-            'providers': providers
-        })
+    # Concurrent AI parse requests share a single batched LLM call
+    terraform_parse_batcher = DynamicBatcher(
+        terraform_agent.parse_terraform_batch,
+        max_batch_size=8,
+        max_wait_ms=20
+    )
 
     @api.route('/api/v1/terraform/parse', methods=['POST'])
     async def parse_terraform():
@@ -937,17 +1155,31 @@ def register_routes(
             terraform_content = data.get('content', '')
             cloud_provider = data.get('cloud_provider', 'aviatrix')
             use_ai = data.get('use_ai', True)  # Enable AI by default
+            force_refresh = data.get('force_refresh', False)
             
             if not terraform_content:
                 return jsonify({'error': 'No Terraform content provided'}), 400
             
-            # Use AI agent if available and requested
-            if use_ai:
-                logger.info(f"Using AI agent to parse Terraform for {cloud_provider}")
-                logger.debug(f"Terraform content length: {len(terraform_content)} chars")
-                result = await terraform_agent.parse_terraform(terraform_content, cloud_provider)
+            # Use AI agent if available and requested; without a model the agent would
+            # only fall back to the regex parser, so skip batching and caching
+            if use_ai and terraform_agent.model_available:
+                # Content re-submitted for the same provider, even with different
+                # formatting or comments, reuses the earlier parse
+                content_hash = content_digest(canonicalize_hcl(terraform_content))
+                cache_key = f"terraform_parse:{cloud_provider}:{content_hash}"
+                if not force_refresh:
+                    cached = await context_cache.get(cache_key)
+                    if cached is not None:
+                        return orjson_response({**cached, 'cached': True})
+
+                logger.info("Using AI agent to parse Terraform for %s", cloud_provider)
+                logger.debug("Terraform content length: %d chars", len(terraform_content))
+                result = await terraform_parse_batcher.submit((terraform_content, cloud_provider))
                 
-                logger.info(f"Parsing result: success={result.success}, rules_count={len(result.rules)}, errors={result.errors}")
+                logger.info(
+                    "Parsing result: success=%s, rules_count=%d, errors=%s",
+                    result.success, len(result.rules), result.errors
+                )
                 
                 if not result.success:
                     return jsonify({
@@ -957,28 +1189,34 @@ def register_routes(
                         'warnings': result.warnings
                     }), 400
                 
-                return jsonify({
+                rules = dedupe_rules(result.rules)
+                payload = {
                     'success': True,
-                    'rules': result.rules,
-                    'count': len(result.rules),
+                    'rules': rules,
+                    'count': len(rules),
                     'warnings': result.warnings,
                     'metadata': result.metadata,
-                    'parser': 'ai' if terraform_agent.model_available else 'regex'
-                })
+                    'parser': 'ai'
+                }
+                await context_cache.set(cache_key, payload)
+                return orjson_response(payload)
             else:
                 # Use regex parser directly
-                logger.info(f"Using regex parser for {cloud_provider}")
-                rules = parse_terraform_content(terraform_content, cloud_provider)
-                
-                return jsonify({
+                logger.info("Using regex parser for %s", cloud_provider)
+                rules = dedupe_rules(parse_terraform_content(terraform_content, cloud_provider))
+                payload = {
                     'success': True,
                     'rules': rules,
                     'count': len(rules),
                     'parser': 'regex'
-                })
+                }
+                if use_ai:
+                    payload['warnings'] = ["Using regex-based parsing (AI unavailable)"]
+                
+                return orjson_response(payload)
         
         except Exception as e:
-            logger.error(f"Terraform parsing failed: {e}")
+            logger.exception("Terraform parsing failed")
             return jsonify({'error': 'Failed to parse Terraform', 'details': str(e)}), 500
 
     @api.route('/api/v1/terraform/validate', methods=['POST'])
@@ -1013,7 +1251,7 @@ def register_routes(
             return jsonify({'error': 'Failed to validate Terraform', 'details': str(e)}), 500
 
     @api.route('/api/v1/terraform/parse-directory', methods=['POST'])
-    def parse_terraform_dir():
+    async def parse_terraform_dir():
         """Parse Terraform files from a local directory"""
         
         try:
@@ -1028,22 +1266,26 @@ def register_routes(
             if not directory_path:
                 return jsonify({'error': 'No directory path provided'}), 400
             
-            # Validate path exists and is a directory
-            if not os.path.exists(directory_path):
+            # Validate path exists and is a directory with a single stat
+            try:
+                path_stat = os.stat(directory_path)
+            except FileNotFoundError:
                 return jsonify({'error': f'Directory not found: {directory_path}'}), 404
             
-            if not os.path.isdir(directory_path):
+            if not stat.S_ISDIR(path_stat.st_mode):
                 return jsonify({'error': f'Path is not a directory: {directory_path}'}), 400
             
-            # Parse all .tf files in directory
-            rules = parse_terraform_directory(directory_path, cloud_provider)
+            # Parse all .tf files in directory off the request thread
+            rules = await parse_terraform_directory_async(directory_path, cloud_provider)
             
-            return jsonify({
-                'success': True,
-                'rules': rules,
-                'count': len(rules),
-                'directory': directory_path
-            })
+            # Stream the rules array so large directories are never encoded in one buffer
+            body = _iter_json_object(
+                {'success': True, 'count': len(rules), 'directory': directory_path},
+                'rules',
+                rules,
+                encode=orjson_encoder()
+            )
+            return Response(body, mimetype='application/json')
         
         except ValueError as e:
             return jsonify({'error': str(e)}), 400
@@ -1051,133 +1293,131 @@ def register_routes(
             logger.error(f"Terraform directory parsing failed: {e}")
             return jsonify({'error': 'Failed to parse Terraform directory', 'details': str(e)}), 500
 
-    @api.route('/api/v1/health', methods=['GET'])
-    def health_check():
+    # Agent and normalization wiring is fixed once routes are registered
+    def _component_status(check: Callable[[], bool]) -> str:
+        try:
+            return 'operational' if check() else 'degraded'
+        except Exception:
+            return 'error'
+
+    agent_status = _component_status(lambda: (
+        callable(getattr(audit_agent, 'audit_firewall_rules', None))
+        and hasattr(audit_agent, 'normalization_engine')
+        and hasattr(audit_agent, 'context_cache')
+    ))
+    normalization_status = _component_status(
+        lambda: bool(getattr(normalization_engine, 'normalizers', {}))
+    )
+
+    # Agent and normalization status are fixed at registration
+    static_operational = agent_status == 'operational' and normalization_status == 'operational'
+    # Frequent health probes reuse the encoded response for up to a second
+    health_body_cache: TTLCache = TTLCache(maxsize=1, ttl=1.0)
+
+    @public_api.route('/api/v1/health', methods=['GET'])
+    async def health_check():
         """Detailed health check with core service probes"""
 
-        def run_async(coro):
-            try:
-                return asyncio.run(coro)
-            except RuntimeError:
-                loop = asyncio.new_event_loop()
-                try:
-                    asyncio.set_event_loop(loop)
-                    return loop.run_until_complete(coro)
-                finally:
-                    loop.close()
-
-        def check_agent() -> str:
-            try:
-                has_method = callable(getattr(audit_agent, 'audit_firewall_rules', None))
-                has_deps = hasattr(audit_agent, 'normalization_engine') and hasattr(audit_agent, 'context_cache')
-                return 'operational' if has_method and has_deps else 'degraded'
-            except Exception:
-                return 'error'
-
-        def check_normalization() -> str:
-            try:
-                normalizers = getattr(normalization_engine, 'normalizers', {})
-                return 'operational' if normalizers else 'degraded'
-            except Exception:
-                return 'error'
+        body = health_body_cache.get('health')
+        if body is not None:
+            return Response(body, mimetype='application/json')
 
-        def check_context_cache() -> str:
-            try:
-                stats = run_async(context_cache.get_stats())
-                return 'operational' if isinstance(stats, dict) else 'degraded'
-            except Exception:
-                return 'error'
+        # Both stats calls are independent, so probe the caches concurrently
+        context_stats, semantic_stats = await asyncio.gather(
+            context_cache.get_stats(),
+            semantic_cache.get_stats(),
+            return_exceptions=True
+        )
 
-        def check_semantic_cache() -> str:
-            try:
-                stats = run_async(semantic_cache.get_stats())
-                has_index = getattr(semantic_cache, 'index', None) is not None
-                return 'operational' if isinstance(stats, dict) and has_index else 'degraded'
-            except Exception:
+        def cache_status(stats: Any, ready: bool = True) -> str:
+            if isinstance(stats, BaseException):
                 return 'error'
+            return 'operational' if isinstance(stats, dict) and ready else 'degraded'
 
-        components = {
-            'agent': check_agent(),
-            'normalization': check_normalization(),
-            'context_cache': check_context_cache(),
-            'semantic_cache': check_semantic_cache()
-        }
-
-        overall = 'healthy' if all(status == 'operational' for status in components.values()) else 'degraded'
+        context_status = cache_status(context_stats)
+        semantic_status = cache_status(
+            semantic_stats,
+            ready=getattr(semantic_cache, 'index', None) is not None
+        )
+        healthy = static_operational and context_status == 'operational' and semantic_status == 'operational'
 
         # Get embedding model information
         embedding_model_info = {}
         try:
             embedding_model_info = semantic_cache.get_model_info()
         except Exception as e:
-            logger.warning(f"Failed to get embedding model info: {e}")
+            logger.warning("Failed to get embedding model info: %s", e)
 
-        return jsonify({
-            'status': overall,
+        body = jsonify({
+            'status': 'healthy' if healthy else 'degraded',
             'version': '1.0.0',
-            'components': components,
-            'supported_providers': [CloudProvider.AVIATRIX.value],
+            'components': {
+                'agent': agent_status,
+                'normalization': normalization_status,
+                'context_cache': context_status,
+                'semantic_cache': semantic_status
+            },
+            'supported_providers': _SUPPORTED_PROVIDER_IDS,
             'embedding_model': embedding_model_info
-        })
+        }).get_data()
+        health_body_cache['health'] = body
+        return Response(body, mimetype='application/json')
+
+    def probe_firestore() -> Dict[str, str]:
+        db = _firestore_client()
+        # Try to access a collection
+        db.collection('health_check').limit(1).get(timeout=_SERVICE_PROBE_TIMEOUT)
+        return {'status': 'connected', 'message': 'Successfully connected to Firestore'}
+
+    def probe_storage() -> Dict[str, str]:
+        storage_client = _storage_client()
+        project_id = os.getenv('GOOGLE_CLOUD_PROJECT', 'rtrentin-01')
+        bucket_name = f"{project_id}-firewall-configs"
+        # Check if bucket exists (a single metadata GET)
+        storage_client.bucket(bucket_name).exists(timeout=_SERVICE_PROBE_TIMEOUT)
+        return {'status': 'connected', 'message': f'Successfully connected to bucket: {bucket_name}'}
+
+    def probe_secret_manager() -> Dict[str, str]:
+        secrets_client = _secrets_client()
+        project_id = os.getenv('GOOGLE_CLOUD_PROJECT', 'rtrentin-01')
+        # Try to access a secret (gemini-api-key)
+        name = f"projects/{project_id}/secrets/gemini-api-key/versions/latest"
+        secrets_client.access_secret_version(request={"name": name}, timeout=_SERVICE_PROBE_TIMEOUT)
+        return {'status': 'connected', 'message': 'Successfully accessed Secret Manager'}
+
+    def probe_vertex_ai() -> Dict[str, str]:
+        project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
+        if not project_id:
+            return {'status': 'not_configured', 'message': 'GOOGLE_CLOUD_PROJECT not set'}
+        _vertex_llm(project_id)
+        return {'status': 'connected', 'message': 'Vertex AI configured'}
+
+    service_probes = {
+        'firestore': probe_firestore,
+        'storage': probe_storage,
+        'secret_manager': probe_secret_manager,
+        'vertex_ai': probe_vertex_ai
+    }
 
-    @api.route('/api/v1/health/services', methods=['GET'])
-    def services_health_check():
-        """Check connectivity to all GCP services"""
-        import os
-        from google.cloud import firestore, storage, secretmanager
-        
-        services = {}
-        
-        # Check Firestore
-        try:
-            db = firestore.Client()
-            # Try to access a collection
-            db.collection('health_check').limit(1).get()
-            services['firestore'] = {'status': 'connected', 'message': 'Successfully connected to Firestore'}
-        except Exception as e:
-            services['firestore'] = {'status': 'error', 'message': str(e)}
-        
-        # Check Cloud Storage
+    async def run_probe(probe: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        loop = asyncio.get_running_loop()
         try:
-            storage_client = storage.Client()
-            project_id = os.getenv('GOOGLE_CLOUD_PROJECT', 'rtrentin-01')
-            bucket_name = f"{project_id}-firewall-configs"
-            bucket = storage_client.bucket(bucket_name)
-            # Check if bucket exists
-            bucket.exists()
-            services['storage'] = {'status': 'connected', 'message': f'Successfully connected to bucket: {bucket_name}'}
+            return await asyncio.wait_for(loop.run_in_executor(_PROBE_EXEC, probe), _SERVICE_PROBE_TIMEOUT)
+        except asyncio.TimeoutError:
+            return {'status': 'timeout', 'message': f'No response within {_SERVICE_PROBE_TIMEOUT:g}s'}
         except Exception as e:
-            services['storage'] = {'status': 'error', 'message': str(e)}
-        
-        # Check Secret Manager
-        try:
-            secrets_client = secretmanager.SecretManagerServiceClient()
-            project_id = os.getenv('GOOGLE_CLOUD_PROJECT', 'rtrentin-01')
-            # Try to access a secret (gemini-api-key)
-            name = f"projects/{project_id}/secrets/gemini-api-key/versions/latest"
-            response = secrets_client.access_secret_version(request={"name": name})
-            services['secret_manager'] = {'status': 'connected', 'message': 'Successfully accessed Secret Manager'}
-        except Exception as e:
-            services['secret_manager'] = {'status': 'error', 'message': str(e)}
-        
-        # Check Vertex AI (if configured)
-        try:
-            from langchain_google_vertexai import ChatVertexAI
-            project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
-            if project_id:
-                llm = ChatVertexAI(
-                    model="gemini-1.5-flash",
-                    project=project_id,
-                    temperature=0
-                )
-                services['vertex_ai'] = {'status': 'connected', 'message': 'Vertex AI configured'}
-            else:
-                services['vertex_ai'] = {'status': 'not_configured', 'message': 'GOOGLE_CLOUD_PROJECT not set'}
-        except Exception as e:
-            services['vertex_ai'] = {'status': 'error', 'message': str(e)}
+            return {'status': 'error', 'message': str(e)}
+
+    @public_api.route('/api/v1/health/services', methods=['GET'])
+    async def services_health_check():
+        """Check connectivity to all GCP services"""
+
+        # Probes are independent RPCs, so total time is the slowest one
+        results = await asyncio.gather(*(run_probe(probe) for probe in service_probes.values()))
+        services = dict(zip(service_probes, results))
         
         # Overall status
-        error_count = sum(1 for s in services.values() if s['status'] == 'error')
+        error_count = sum(1 for s in services.values() if s['status'] in ('error', 'timeout'))
         overall = 'healthy' if error_count == 0 else 'degraded' if error_count < len(services) else 'unhealthy'
         
         return jsonify({
@@ -1187,26 +1427,76 @@ def register_routes(
             'region': os.getenv('GCP_REGION', 'not_set')
         })
 
-    # Register blueprint
+    @api.route('/api/v1/batch', methods=['POST'])
+    async def batch_requests():
+        """Run several GET endpoints in one authenticated call"""
+
+        data = request.get_json(silent=True) or {}
+        paths = data.get('requests')
+        if not isinstance(paths, list) or not paths or not all(isinstance(p, str) for p in paths):
+            return jsonify({'error': 'requests must be a non-empty list of paths'}), 400
+        if len(paths) > _BATCH_MAX_REQUESTS:
+            return jsonify({'error': f'At most {_BATCH_MAX_REQUESTS} requests per batch'}), 400
+
+        flask_app = current_app._get_current_object()
+        adapter = flask_app.url_map.bind('')
+        # Views that re-check credentials themselves see the caller's header
+        sub_headers = {'Authorization': request.headers.get('Authorization', '')}
+
+        def to_result(rv: Any) -> Dict[str, Any]:
+            response = flask_app.make_response(rv)
+            response.direct_passthrough = False
+            body = response.get_json(silent=True)
+            return {
+                'status': response.status_code,
+                'body': body if body is not None else response.get_data(as_text=True)
+            }
+
+        async def dispatch(path: str) -> Dict[str, Any]:
+            # Authorization was checked once for the batch; sub-requests call the
+            # view directly and skip before_request
+            route_path = urlsplit(path).path
+            if not route_path.startswith('/api/v1/') or route_path == '/api/v1/batch':
+                return {'status': 400, 'body': {'error': 'Unsupported path'}}
+            try:
+                endpoint, view_args = adapter.match(route_path, method='GET')
+            except HTTPException as e:
+                return {'status': e.code, 'body': {'error': e.name}}
+
+            view = flask_app.view_functions[endpoint]
+            if asyncio.iscoroutinefunction(view):
+                with flask_app.test_request_context(path, method='GET', headers=sub_headers):
+                    return to_result(await view(**view_args))
+
+            def run_sync() -> Dict[str, Any]:
+                with flask_app.test_request_context(path, method='GET', headers=sub_headers):
+                    return to_result(view(**view_args))
+
+            return await asyncio.to_thread(run_sync)
+
+        results = await asyncio.gather(*(dispatch(path) for path in paths), return_exceptions=True)
+
+        responses = {}
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                logger.error("Batch sub-request %s failed: %s", path, result)
+                result = {'status': 500, 'body': {'error': 'Internal server error', 'details': str(result)}}
+            responses[path] = result
+
+        return jsonify({
+            'success': True,
+            'responses': responses
+        })
+
+    # Register blueprints
     try:
         app.register_blueprint(api)
-        logger.info("API blueprint registered successfully")
-        # Log registered routes for debugging
-        registered_routes = [rule.rule for rule in app.url_map.iter_rules() if '/api/v1/' in rule.rule]
-        logger.info(f"Registered {len(registered_routes)} API routes: {', '.join(registered_routes[:10])}")
+        app.register_blueprint(public_api)
+        logger.info("API blueprints registered successfully")
+        # Log registered routes for debugging; skip the url_map walk when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            registered_routes = [rule.rule for rule in app.url_map.iter_rules() if '/api/v1/' in rule.rule]
+            logger.info("Registered %d API routes: %s", len(registered_routes), ', '.join(registered_routes[:10]))
     except Exception as e:
         logger.error(f"Failed to register API blueprint: {e}", exc_info=True)
         raise
-
-def get_provider_description(provider: CloudProvider) -> str:
-    """Get description for a cloud provider"""
-
-    descriptions = {
-        CloudProvider.GCP: "Google Cloud Platform - VPC Firewalls, Cloud Armor",
-        CloudProvider.AZURE: "Microsoft Azure - Network Security Groups, Azure Firewall",
-        CloudProvider.AVIATRIX: "Aviatrix Distributed Cloud Firewall - SmartGroups, WebGroups",
-        CloudProvider.CISCO: "Cisco ASA - Access Control Lists",
-        CloudProvider.PALO_ALTO: "Palo Alto Networks - Security Policies"
-    }
-
-    return descriptions.get(provider, "Firewall rules")
\ No newline at end of file
@@ -5,9 +5,14 @@ Main Flask application with LangGraph orchestration
 
 import os
 import logging
+import threading
+import time
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from dotenv import load_dotenv
+from asgiref.sync import sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+from api.json_provider import OrjsonProvider
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +23,7 @@ logger = logging.getLogger(__name__)
 
 # Initialize Flask app
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(app)
 
 # Import telemetry config first
@@ -39,7 +45,7 @@ if use_opentelemetry:
         instrument_flask_app(app)
         logger.info("OpenTelemetry initialized and Flask app instrumented")
     except Exception as e:
-        logger.warning(f"Failed to initialize OpenTelemetry: {e}. Falling back to custom collector.")
+        logger.warning("Failed to initialize OpenTelemetry: %s. Falling back to custom collector.", e)
 
 # Import core components
 from langgraph.agent import FirewallAuditAgent
@@ -68,13 +74,29 @@ telemetry_collector.track_system_event('application_startup')
 normalization_engine = NormalizationEngine()
 context_cache = ContextCache()
 semantic_cache = SemanticCache()
+# Load model kernels in the background so the server starts accepting requests promptly
+threading.Thread(target=semantic_cache.warm_up, name='semantic-cache-warmup', daemon=True).start()
 rag_knowledge_base = RAGKnowledgeBase(persistent_storage=persistent_storage)
 audit_agent = FirewallAuditAgent(rag_knowledge_base=rag_knowledge_base)
 # Compliance agent will be initialized in routes.py to have access to rag_knowledge_base
 
+# Upload the RAG index periodically so shutdown only has to flush recent changes
+RAG_FLUSH_INTERVAL = float(os.getenv('RAG_FLUSH_INTERVAL', '30'))
+
+def flush_rag_index_periodically():
+    """Flush the RAG index to persistent storage whenever it has changed"""
+    while True:
+        time.sleep(RAG_FLUSH_INTERVAL)
+        try:
+            rag_knowledge_base.flush_index()
+        except Exception as e:
+            logger.error("Periodic RAG index flush failed: %s", e)
+
+threading.Thread(target=flush_rag_index_periodically, name='rag-index-flush', daemon=True).start()
+
 # Register shutdown hook to save RAG state
 def save_rag_state():
-    """Save RAG knowledge base state on shutdown"""
+    """Flush any unsaved RAG index changes on shutdown"""
     try:
         if rag_knowledge_base:
             rag_knowledge_base.save_state()
@@ -110,9 +132,61 @@ def internal_error(error):
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
 
+# ASGI entry point (serve with: uvicorn app:asgi_app)
+class _ConcurrentWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """Run each WSGI call in the shared thread pool instead of asgiref's single
+    thread-sensitive worker, so requests are not serialized. Async views awaited
+    from those threads are scheduled on the server's one persistent event loop."""
+
+    @sync_to_async(thread_sensitive=False)
+    def run_wsgi_app(self, body):
+        """Run the WSGI app for one request in a pool thread, sending its response as it is produced"""
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError:
+            # build_environ rejects requests over the duplicate header limit
+            self.sync_send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [(b"content-type", b"text/plain")],
+            })
+            self.sync_send({"type": "http.response.body", "body": b"Bad Request: Too many duplicate headers"})
+            return
+
+        bytes_sent = 0
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in response:
+                if not self.response_started:
+                    self.response_started = True
+                    self.sync_send(self.response_start)
+                # Never send more than a declared Content-Length
+                if self.response_content_length is not None:
+                    output = output[:self.response_content_length - bytes_sent]
+                self.sync_send({"type": "http.response.body", "body": output, "more_body": True})
+                bytes_sent += len(output)
+                if bytes_sent == self.response_content_length:
+                    break
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+
+        if not self.response_started:
+            self.response_started = True
+            self.sync_send(self.response_start)
+        self.sync_send({"type": "http.response.body"})
+
+class _ConcurrentWsgiToAsgi(WsgiToAsgi):
+    async def __call__(self, scope, receive, send):
+        await _ConcurrentWsgiToAsgiInstance(self.wsgi_application, self.duplicate_header_limit)(
+            scope, receive, send
+        )
+
+asgi_app = _ConcurrentWsgiToAsgi(app)
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     debug = os.environ.get('FLASK_ENV') == 'development'
 
-    logger.info(f"Starting Firewall AI on port {port}")
+    logger.info("Starting Firewall AI on port %s", port)
     app.run(host='0.0.0.0', port=port, debug=debug)
\ No newline at end of file
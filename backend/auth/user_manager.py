@@ -3,22 +3,74 @@ User Management - Local user storage and management
 Handles user creation, authentication, and role management
 """
 
+import atexit
 import logging
 import os
-import json
 import hashlib
+import hmac
 import secrets
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
+from datetime import datetime, timezone
 from pathlib import Path
 import threading
+import time
+from collections import Counter
+
+import orjson
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
 
 logger = logging.getLogger(__name__)
 
+# Logins only update last_login, so those saves are coalesced and written at most this often
+_SAVE_INTERVAL_SECONDS = float(os.getenv('USER_SAVE_INTERVAL', '5'))
+
+# PHC-format prefix of Argon2 hashes; anything else is a legacy "salt:sha256" hash
+_ARGON2_PREFIX = '$argon2'
+
+
+def _resolve_default_storage() -> str:
+    """Pick the users file location: /tmp inside containers, the home directory otherwise"""
+    # Use container-friendly path
+    is_container = (
+        os.path.exists('/.dockerenv') or 
+        os.getenv('CONTAINER_ENV') == 'true' or 
+        os.getenv('K_SERVICE') is not None
+    )
+    
+    if is_container:
+        return '/tmp/.firewall-ai/users.json'
+    return os.path.join(
+        os.path.expanduser('~'), 
+        '.firewall-ai', 
+        'users.json'
+    )
+
+
+# Resolved once at import
+_DEFAULT_STORAGE_FILE = _resolve_default_storage()
+
+
+def _parse_utc_iso(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds for a stored ISO time; naive values are UTC"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning("Ignoring unparseable last_login %r", value)
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
 
 class User:
     """Represents a user in the system"""
     
+    # Fixed attribute layout keeps large user tables compact; last_login is a property over _last_login
+    __slots__ = ('user_id', 'username', 'email', 'password_hash', 'role', 'created_at', '_last_login', 'active')
+    
     def __init__(
         self,
         username: str,
@@ -27,7 +79,7 @@ class User:
         role: str = "user",
         user_id: Optional[str] = None,
         created_at: Optional[str] = None,
-        last_login: Optional[str] = None,
+        last_login: Optional[float] = None,
         active: bool = True
     ):
         self.user_id = user_id or secrets.token_urlsafe(16)
@@ -36,9 +88,26 @@ class User:
         self.password_hash = password_hash
         self.role = role  # "admin", "user", "viewer"
         self.created_at = created_at or datetime.utcnow().isoformat()
-        self.last_login = last_login
+        # Epoch seconds; formatted as an ISO string only when read
+        self._last_login: Optional[float] = last_login
         self.active = active
     
+    @property
+    def last_login(self) -> Optional[str]:
+        """Last login time as a UTC ISO string"""
+        if self._last_login is None:
+            return None
+        # Naive UTC ISO, the format stored before logins were kept as timestamps
+        return datetime.fromtimestamp(self._last_login, timezone.utc).replace(tzinfo=None).isoformat()
+    
+    @last_login.setter
+    def last_login(self, value: Optional[str]) -> None:
+        self._last_login = _parse_utc_iso(value)
+    
+    def record_login(self) -> None:
+        """Record a login now without formatting the time until it is read"""
+        self._last_login = time.time()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert user to dictionary (without password hash)"""
         return {
@@ -67,7 +136,7 @@ class User:
             password_hash=data['password_hash'],
             role=data.get('role', 'user'),
             created_at=data.get('created_at'),
-            last_login=data.get('last_login'),
+            last_login=_parse_utc_iso(data.get('last_login')),
             active=data.get('active', True)
         )
 
@@ -76,63 +145,81 @@ class UserManager:
     """Manages users with local JSON storage"""
     
     def __init__(self, storage_file: Optional[str] = None):
-        # Use container-friendly path
-        is_container = (
-            os.path.exists('/.dockerenv') or 
-            os.getenv('CONTAINER_ENV') == 'true' or 
-            os.getenv('K_SERVICE') is not None
+        self.storage_file = storage_file or _DEFAULT_STORAGE_FILE
+        
+        # Argon2id parameters are tunable to keep login latency in budget
+        self._password_hasher = PasswordHasher(
+            time_cost=int(os.getenv('ARGON2_TIME_COST', '3')),
+            memory_cost=int(os.getenv('ARGON2_MEMORY_COST', '65536')),
+            parallelism=int(os.getenv('ARGON2_PARALLELISM', '4'))
         )
         
-        if storage_file:
-            self.storage_file = storage_file
-        elif is_container:
-            self.storage_file = '/tmp/.firewall-ai/users.json'
-        else:
-            self.storage_file = os.path.join(
-                os.path.expanduser('~'), 
-                '.firewall-ai', 
-                'users.json'
-            )
+        # fsync the users file and its directory on save so a crash can't leave it truncated
+        self.fsync_enabled = os.getenv('USER_STORE_FSYNC', 'true').lower() == 'true'
         
         self._lock = threading.Lock()
+        # Set when in-memory users have changes not yet written to storage
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
         self._users: Dict[str, User] = {}
+        # Secondary indexes to user_id; emails are matched case-insensitively
+        self._by_username: Dict[str, str] = {}
+        self._by_email: Dict[str, str] = {}
+        # Immutable copies of the three dicts for lock-free readers; writers republish under the lock
+        self._snapshot: Tuple[Dict[str, User], Dict[str, str], Dict[str, str]] = ({}, {}, {})
+        self._stats: Dict[str, Any] = {}
         self._load_users()
         self._ensure_default_admin()
+        
+        self._flush_thread = threading.Thread(target=self._flush_loop, name='user-store-flush', daemon=True)
+        self._flush_thread.start()
+        atexit.register(self.close)
     
     def _hash_password(self, password: str) -> str:
-        """Hash password using SHA-256 with salt"""
-        # For local development, using SHA-256 is acceptable
-        # For production, consider using bcrypt or argon2
-        salt = secrets.token_hex(16)
-        hash_obj = hashlib.sha256()
-        hash_obj.update((password + salt).encode('utf-8'))
-        password_hash = hash_obj.hexdigest()
-        return f"{salt}:{password_hash}"
+        """Hash password using Argon2id"""
+        return self._password_hasher.hash(password)
     
     def _verify_password(self, password: str, password_hash: str) -> bool:
-        """Verify password against hash"""
+        """Verify password against an Argon2 or legacy salted SHA-256 hash"""
+        if password_hash.startswith(_ARGON2_PREFIX):
+            try:
+                return self._password_hasher.verify(password_hash, password)
+            except (VerificationError, InvalidHashError):
+                return False
+        
+        salt, sep, stored_hash = password_hash.partition(':')
+        if not sep:
+            return False
         try:
-            salt, stored_hash = password_hash.split(':', 1)
-            hash_obj = hashlib.sha256()
-            hash_obj.update((password + salt).encode('utf-8'))
-            computed_hash = hash_obj.hexdigest()
-            return computed_hash == stored_hash
-        except Exception:
+            stored_digest = bytes.fromhex(stored_hash)
+        except ValueError:
             return False
+        computed_digest = hashlib.sha256((password + salt).encode('utf-8')).digest()
+        return hmac.compare_digest(computed_digest, stored_digest)
+    
+    def _needs_rehash(self, password_hash: str) -> bool:
+        """Whether a verified hash should be upgraded to Argon2id with the current parameters"""
+        if not password_hash.startswith(_ARGON2_PREFIX):
+            return True
+        try:
+            return self._password_hasher.check_needs_rehash(password_hash)
+        except InvalidHashError:
+            return True
     
     def _load_users(self) -> None:
         """Load users from storage file"""
         try:
             storage_path = Path(self.storage_file)
             if storage_path.exists():
-                with open(storage_path, 'r') as f:
-                    data = json.load(f)
-                    users_data = data.get('users', [])
-                    self._users = {
-                        user_data['user_id']: User.from_dict(user_data)
-                        for user_data in users_data
-                    }
-                    logger.info(f"Loaded {len(self._users)} users from storage")
+                data = orjson.loads(storage_path.read_bytes())
+                users_data = data.get('users', [])
+                self._users = {
+                    user_data['user_id']: User.from_dict(user_data)
+                    for user_data in users_data
+                }
+                for user in self._users.values():
+                    self._index_user(user)
+                logger.info("Loaded %d users from storage", len(self._users))
             else:
                 # Create directory if it doesn't exist
                 storage_path.parent.mkdir(parents=True, exist_ok=True)
@@ -140,26 +227,97 @@ class UserManager:
         except Exception as e:
             logger.error(f"Failed to load users: {e}")
             self._users = {}
+            self._by_username = {}
+            self._by_email = {}
+        self._publish()
+    
+    def _publish(self) -> None:
+        """Swap in a fresh snapshot of users, indexes and stats for readers"""
+        self._snapshot = (dict(self._users), dict(self._by_username), dict(self._by_email))
+        
+        # Counted once per write so get_stats needs no scan
+        active_roles = Counter(u.role for u in self._users.values() if u.active)
+        total = len(self._users)
+        active = sum(active_roles.values())
+        self._stats = {
+            'total_users': total,
+            'active_users': active,
+            'inactive_users': total - active,
+            'admins': active_roles['admin'],
+            'users': active_roles['user'],
+            'viewers': active_roles['viewer']
+        }
+    
+    def _index_user(self, user: User) -> None:
+        """Add a user to the username and email indexes"""
+        self._by_username[user.username] = user.user_id
+        self._by_email[user.email.lower()] = user.user_id
+    
+    def _unindex_user(self, user: User) -> None:
+        """Remove a user from the username and email indexes"""
+        if self._by_username.get(user.username) == user.user_id:
+            del self._by_username[user.username]
+        if self._by_email.get(user.email.lower()) == user.user_id:
+            del self._by_email[user.email.lower()]
+    
+    def _find_by_username(self, username: str) -> Optional[User]:
+        """Look up a user by username; callers hold the lock or are single-threaded"""
+        user_id = self._by_username.get(username)
+        return self._users.get(user_id) if user_id else None
+    
+    def _find_by_email(self, email: str) -> Optional[User]:
+        """Look up a user by email; callers hold the lock or are single-threaded"""
+        user_id = self._by_email.get(email.lower())
+        return self._users.get(user_id) if user_id else None
+    
+    def _flush_loop(self) -> None:
+        """Write pending changes periodically until stopped"""
+        while not self._stop.wait(_SAVE_INTERVAL_SECONDS):
+            self.flush()
+    
+    def close(self) -> None:
+        """Stop the flush thread and write any unsaved changes"""
+        self._stop.set()
+        if self._flush_thread is not threading.current_thread():
+            self._flush_thread.join()
+        self.flush()
+        atexit.unregister(self.close)
+    
+    def flush(self) -> None:
+        """Write users to storage if there are unsaved changes"""
+        if self._dirty.is_set():
+            with self._lock:
+                self._save_users()
     
     def _save_users(self) -> None:
         """Save users to storage file"""
+        self._dirty.clear()
         try:
             storage_path = Path(self.storage_file)
             storage_path.parent.mkdir(parents=True, exist_ok=True)
             
             # Write to a temporary file first, then rename (atomic operation)
             temp_path = storage_path.with_suffix('.json.tmp')
-            users_data = {
-                'users': [user.to_dict_with_password() for user in self._users.values()],
-                'updated_at': datetime.utcnow().isoformat()
-            }
-            with open(temp_path, 'w') as f:
-                json.dump(users_data, f, indent=2)
+            # Users are encoded one at a time into the same {"users": [...]} document,
+            # so no list of every user's dict is built first
+            with open(temp_path, 'wb') as f:
+                f.write(b'{\n  "users": [')
+                for i, user in enumerate(self._users.values()):
+                    f.write(b',\n    ' if i else b'\n    ')
+                    f.write(orjson.dumps(user.to_dict_with_password()))
+                f.write(b'\n  ],\n  "updated_at": ' + orjson.dumps(datetime.utcnow().isoformat()) + b'\n}')
+                if self.fsync_enabled:
+                    f.flush()
+                    os.fsync(f.fileno())
             # Atomic rename
             temp_path.replace(storage_path)
+            if self.fsync_enabled:
+                self._fsync_directory(storage_path.parent)
             logger.debug(f"Saved {len(self._users)} users to storage")
         except Exception as e:
             logger.error(f"Failed to save users to {self.storage_file}: {e}", exc_info=True)
+            # Retried by the background flush
+            self._dirty.set()
             # Clean up temp file if it exists
             temp_path = storage_path.with_suffix('.json.tmp')
             if temp_path.exists():
@@ -170,6 +328,17 @@ class UserManager:
             # Don't re-raise - allow caller to continue even if save fails
             # This prevents authentication from failing due to file I/O issues
     
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        """Persist a rename by syncing its directory entry (no-op where directories can't be opened)"""
+        if not hasattr(os, 'O_DIRECTORY'):
+            return
+        dir_fd = os.open(str(directory), os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+    
     def _ensure_default_admin(self) -> None:
         """Ensure default admin user exists"""
         # Check if any admin exists
@@ -196,35 +365,40 @@ class UserManager:
                     role='admin'
                 )
                 self._users[admin_user.user_id] = admin_user
+                self._index_user(admin_user)
                 logger.info(f"Created default admin user: {admin_username}")
             
+            self._publish()
             self._save_users()
     
     def authenticate(self, username: str, password: str) -> Optional[User]:
         """Authenticate a user"""
         try:
+            user = self.get_user_by_username(username)
+            if not user:
+                return None
+            
+            if not user.active:
+                logger.warning("Attempted login for inactive user: %s", username)
+                return None
+            
+            # Argon2 verify/rehash is deliberately slow, so it runs outside the lock
+            password_hash = user.password_hash
+            if not self._verify_password(password, password_hash):
+                return None
+            
+            # Legacy or outdated hashes are upgraded on a successful login
+            new_hash = self._hash_password(password) if self._needs_rehash(password_hash) else None
+            
             with self._lock:
-                user = self.get_user_by_username(username)
-                if not user:
-                    return None
-                
-                if not user.active:
-                    logger.warning(f"Attempted login for inactive user: {username}")
-                    return None
-                
-                if not self._verify_password(password, user.password_hash):
-                    return None
-                
-                # Update last login
-                user.last_login = datetime.utcnow().isoformat()
-                # Save users, but don't fail authentication if save fails
-                try:
-                    self._save_users()
-                except Exception as e:
-                    logger.warning(f"Failed to save users after authentication: {e}")
-                    # Continue anyway - authentication succeeded
-                
-                return user
+                # Keep a password changed while we were hashing
+                if new_hash is not None and user.password_hash == password_hash:
+                    user.password_hash = new_hash
+                # Update last login; written by the background flush
+                user.record_login()
+                self._dirty.set()
+            
+            return user
         except Exception as e:
             logger.error(f"Authentication error for user {username}: {e}", exc_info=True)
             return None
@@ -239,11 +413,11 @@ class UserManager:
         """Create a new user"""
         with self._lock:
             # Check if username already exists
-            if self.get_user_by_username(username):
+            if self._find_by_username(username):
                 raise ValueError(f"Username '{username}' already exists")
             
             # Check if email already exists
-            if self.get_user_by_email(email):
+            if self._find_by_email(email):
                 raise ValueError(f"Email '{email}' already exists")
             
             # Validate role
@@ -258,6 +432,8 @@ class UserManager:
             )
             
             self._users[user.user_id] = user
+            self._index_user(user)
+            self._publish()
             self._save_users()
             logger.info(f"Created user: {username} ({role})")
             
@@ -280,17 +456,21 @@ class UserManager:
             
             if username and username != user.username:
                 # Check if new username is taken
-                existing = self.get_user_by_username(username)
+                existing = self._find_by_username(username)
                 if existing and existing.user_id != user_id:
                     raise ValueError(f"Username '{username}' already exists")
-                user.username = username
             
             if email and email != user.email:
                 # Check if new email is taken
-                existing = self.get_user_by_email(email)
+                existing = self._find_by_email(email)
                 if existing and existing.user_id != user_id:
                     raise ValueError(f"Email '{email}' already exists")
-                user.email = email
+            
+            if (username and username != user.username) or (email and email != user.email):
+                self._unindex_user(user)
+                user.username = username or user.username
+                user.email = email or user.email
+                self._index_user(user)
             
             if password:
                 user.password_hash = self._hash_password(password)
@@ -303,6 +483,7 @@ class UserManager:
             if active is not None:
                 user.active = active
             
+            self._publish()
             self._save_users()
             logger.info(f"Updated user: {user_id}")
             
@@ -322,6 +503,8 @@ class UserManager:
                 raise ValueError("Cannot delete the last admin user")
             
             del self._users[user_id]
+            self._unindex_user(user)
+            self._publish()
             self._save_users()
             logger.info(f"Deleted user: {user_id}")
             
@@ -329,50 +512,30 @@ class UserManager:
     
     def get_user(self, user_id: str) -> Optional[User]:
         """Get user by ID"""
-        with self._lock:
-            return self._users.get(user_id)
+        return self._snapshot[0].get(user_id)
     
     def get_user_by_username(self, username: str) -> Optional[User]:
         """Get user by username"""
-        with self._lock:
-            for user in self._users.values():
-                if user.username == username:
-                    return user
-            return None
+        users, by_username, _ = self._snapshot
+        user_id = by_username.get(username)
+        return users.get(user_id) if user_id else None
     
     def get_user_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        with self._lock:
-            for user in self._users.values():
-                if user.email == email:
-                    return user
-            return None
+        users, _, by_email = self._snapshot
+        user_id = by_email.get(email.lower())
+        return users.get(user_id) if user_id else None
     
     def list_users(self, include_inactive: bool = False) -> List[User]:
         """List all users"""
-        with self._lock:
-            users = list(self._users.values())
-            if not include_inactive:
-                users = [u for u in users if u.active]
-            return sorted(users, key=lambda u: u.created_at)
+        users = list(self._snapshot[0].values())
+        if not include_inactive:
+            users = [u for u in users if u.active]
+        return sorted(users, key=lambda u: u.created_at)
     
     def get_stats(self) -> Dict[str, Any]:
         """Get user statistics"""
-        with self._lock:
-            total = len(self._users)
-            active = sum(1 for u in self._users.values() if u.active)
-            admins = sum(1 for u in self._users.values() if u.role == 'admin' and u.active)
-            users = sum(1 for u in self._users.values() if u.role == 'user' and u.active)
-            viewers = sum(1 for u in self._users.values() if u.role == 'viewer' and u.active)
-            
-            return {
-                'total_users': total,
-                'active_users': active,
-                'inactive_users': total - active,
-                'admins': admins,
-                'users': users,
-                'viewers': viewers
-            }
+        return dict(self._stats)
 
 
 # Global instance
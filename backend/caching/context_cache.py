@@ -4,23 +4,58 @@ Caches large firewall configurations in memory to reduce LLM input token costs
 """
 
 import logging
-import hashlib
-import json
-from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+from datetime import datetime, timedelta, timezone
 import asyncio
 from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+import orjson
+
+from utils.hashing import content_digest, content_hasher
 
 logger = logging.getLogger(__name__)
 
+
+@lru_cache(maxsize=1)
+def _shared_executor() -> ThreadPoolExecutor:
+    """Executor for key hashing, created on first use and shared by every ContextCache"""
+    return ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 4), thread_name_prefix='context-cache')
+
+
+@lru_cache(maxsize=1024)
+def _normalize_intent(intent: str) -> str:
+    """Case- and whitespace-insensitive intent; a handful of intents repeat across requests"""
+    return intent.lower().strip()
+
+
+@lru_cache(maxsize=4096)
+def _signature_digest(signature: Tuple[Any, ...]) -> str:
+    """Digest a rule's pattern fields; batches repeat the same patterns, so results are memoized"""
+    direction, action, protocols, ports = signature
+    return content_digest(orjson.dumps({
+        "direction": direction,
+        "action": action,
+        "protocols": protocols,
+        "ports": ports
+    }, option=orjson.OPT_SORT_KEYS))
+
+
 class ContextCache:
     """Context caching system for firewall configurations"""
 
-    def __init__(self, max_size: int = 1000, ttl_hours: int = 24):
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, max_size: int = 1000, ttl_hours: int = 24, max_bytes: int = 256 * 1024 * 1024):
+        # Kept in least-recently-used order; entries carry a monotonic expiry
+        self.cache: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
         self.max_size = max_size
+        # Budget on the summed serialized size of cached data, tracked as entries come and go
+        self.max_bytes = max_bytes
+        self._total_bytes = 0
         self.ttl = timedelta(hours=ttl_hours)
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        self.executor = _shared_executor()
 
     def generate_key(self, rules: List[Dict[str, Any]], intent: str) -> str:
         """Generate cache key from rules and intent"""
@@ -28,152 +63,176 @@ class ContextCache:
         # Create a deterministic representation
         rules_summary = {
             "rule_count": len(rules),
-            "providers": list(set(rule.get("cloud_provider", "unknown") for rule in rules)),
-            "directions": list(set(rule.get("direction", "unknown") for rule in rules)),
-            "actions": list(set(rule.get("action", "unknown") for rule in rules)),
+            # Sorted so equal rule sets always encode the same, whatever the set order
+            "providers": sorted({rule.get("cloud_provider", "unknown") for rule in rules}, key=str),
+            "directions": sorted({rule.get("direction", "unknown") for rule in rules}, key=str),
+            "actions": sorted({rule.get("action", "unknown") for rule in rules}, key=str),
             # Hash the actual rule content for uniqueness
             "rules_hash": self._hash_rules(rules)
         }
 
         cache_data = {
             "rules_summary": rules_summary,
-            "intent": intent.lower().strip(),
-            "timestamp": datetime.utcnow().isoformat()
+            "intent": _normalize_intent(intent)
         }
 
-        # Create SHA256 hash of the cache data
-        cache_string = json.dumps(cache_data, sort_keys=True)
-        return hashlib.sha256(cache_string.encode()).hexdigest()
+        # Create a digest of the cache data
+        return content_digest(orjson.dumps(cache_data, option=orjson.OPT_SORT_KEYS))
 
     async def get(self, key: str) -> Optional[Any]:
         """Retrieve cached result"""
 
-        if key not in self.cache:
-            return None
+        data = self._lookup(key)
+        if data is not None:
+            logger.debug("Cache hit for key %.8s...", key)
+        return data
+
+    async def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Retrieve several cached results, with None for each miss"""
+
+        results = [self._lookup(key) for key in keys]
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Cache mget: %d/%d hits", sum(1 for data in results if data is not None), len(keys))
+        return results
+
+    async def set(self, key: str, data: Any) -> None:
+        """Store result in cache"""
+
+        if await self._store(key, data):
+            logger.debug("Cached result for key %.8s...", key)
+
+    async def mset(self, items: Dict[str, Any]) -> None:
+        """Store several results in cache"""
+
+        stored = 0
+        for key, data in items.items():
+            stored += await self._store(key, data)
+        logger.debug("Cached %d/%d results", stored, len(items))
 
-        cached_item = self.cache[key]
-        cached_time = datetime.fromisoformat(cached_item["timestamp"])
+    def _lookup(self, key: str) -> Optional[Any]:
+        """Return cached data for a key, dropping it if expired"""
+
+        cached_item = self.cache.get(key)
+        if cached_item is None:
+            return None
 
         # Check if cache is expired
-        if datetime.utcnow() - cached_time > self.ttl:
-            logger.info(f"Cache expired for key {key[:8]}...")
-            del self.cache[key]
+        if cached_item["expires_at"] < time.monotonic():
+            logger.debug("Cache expired for key %.8s...", key)
+            self._remove(key)
             return None
 
-        logger.info(f"Cache hit for key {key[:8]}...")
+        self.cache.move_to_end(key)
         return cached_item["data"]
 
-    async def set(self, key: str, data: Any) -> None:
-        """Store result in cache"""
+    async def _store(self, key: str, data: Any) -> bool:
+        """Cache data under key; returns False if it alone exceeds the byte budget"""
+        size = self._estimate_size(data)
+
+        # Drop any previous value either way so a stale result is never served for this key
+        self._remove(key)
+        if size > self.max_bytes:
+            logger.warning("Not caching %d-byte result for key %.8s...: exceeds the %d-byte budget", size, key, self.max_bytes)
+            return False
 
-        # Evict old entries if cache is full
-        if len(self.cache) >= self.max_size:
-            await self._evict_old_entries()
+        # Evict least-recently-used entries until both the entry and byte budgets fit
+        while self.cache and (len(self.cache) >= self.max_size or self._total_bytes + size > self.max_bytes):
+            _, evicted = self.cache.popitem(last=False)
+            self._total_bytes -= evicted["size"]
 
         self.cache[key] = {
             "data": data,
-            "timestamp": datetime.utcnow().isoformat(),
-            "size": self._estimate_size(data)
+            "expires_at": time.monotonic() + self.ttl.total_seconds(),
+            "created_at": time.time(),
+            "size": size
         }
+        self._total_bytes += size
+        return True
 
-        logger.info(f"Cached result for key {key[:8]}...")
+    def _remove(self, key: str) -> None:
+        """Drop an entry, if present, and release its bytes"""
+        cached_item = self.cache.pop(key, None)
+        if cached_item is not None:
+            self._total_bytes -= cached_item["size"]
 
     async def clear(self) -> None:
         """Clear all cached entries"""
         self.cache.clear()
+        self._total_bytes = 0
         logger.info("Cache cleared")
 
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
-        total_size = sum(item["size"] for item in self.cache.values())
-        oldest_entry = min(
-            (datetime.fromisoformat(item["timestamp"]) for item in self.cache.values()),
-            default=None
-        )
+        oldest_entry = min((item["created_at"] for item in self.cache.values()), default=None)
 
         return {
             "entries": len(self.cache),
-            "total_size_mb": total_size / (1024 * 1024),
+            "total_size_mb": self._total_bytes / (1024 * 1024),
+            "max_size_mb": self.max_bytes / (1024 * 1024),
             "max_size": self.max_size,
             "utilization_percent": (len(self.cache) / self.max_size) * 100,
-            "oldest_entry": oldest_entry.isoformat() if oldest_entry else None,
+            "oldest_entry": datetime.fromtimestamp(oldest_entry, timezone.utc).replace(tzinfo=None).isoformat() if oldest_entry else None,
             "ttl_hours": self.ttl.total_seconds() / 3600
         }
 
     def _hash_rules(self, rules: List[Dict[str, Any]]) -> str:
         """Create hash of rule content for cache key"""
 
-        # Extract key fields that affect audit results
-        rule_signatures = []
-        for rule in rules:
-            signature = {
-                "id": rule.get("id", ""),
-                "direction": rule.get("direction", ""),
-                "action": rule.get("action", ""),
-                "source_ranges": sorted(rule.get("source_ranges", [])),
-                "destination_ranges": sorted(rule.get("destination_ranges", [])),
-                "protocols": sorted(rule.get("protocols", [])),
-                "ports": sorted(rule.get("ports", [])),
-                "tags": sorted(rule.get("source_tags", []) + rule.get("target_tags", []))
-            }
-            rule_signatures.append(signature)
-
-        # Sort for deterministic hashing
-        rule_signatures.sort(key=lambda x: x["id"])
-
-        signature_string = json.dumps(rule_signatures, sort_keys=True)
-        return hashlib.sha256(signature_string.encode()).hexdigest()
+        # Key fields that affect audit results are hashed one rule at a time, in id
+        # order for determinism, without building a list of signatures
+        hasher = content_hasher()
+        for rule in sorted(rules, key=lambda r: r.get("id", "")):
+            hasher.update(orjson.dumps((
+                rule.get("id", ""),
+                rule.get("direction", ""),
+                rule.get("action", ""),
+                sorted(rule.get("source_ranges", [])),
+                sorted(rule.get("destination_ranges", [])),
+                sorted(rule.get("protocols", [])),
+                sorted(rule.get("ports", [])),
+                sorted(rule.get("source_tags", []) + rule.get("target_tags", []))
+            )))
+        return hasher.hexdigest()
 
     def _estimate_size(self, data: Any) -> int:
         """Estimate memory size of cached data in bytes"""
-        return len(json.dumps(data, default=str).encode('utf-8'))
-
-    async def _evict_old_entries(self, keep_percent: float = 0.8) -> None:
-        """Evict oldest entries to make room"""
-
-        if not self.cache:
-            return
-
-        # Sort by timestamp (oldest first)
-        sorted_entries = sorted(
-            self.cache.items(),
-            key=lambda x: datetime.fromisoformat(x[1]["timestamp"])
-        )
-
-        # Keep only the most recent entries
-        keep_count = int(len(sorted_entries) * keep_percent)
-        entries_to_remove = sorted_entries[:-keep_count]
-
-        for key, _ in entries_to_remove:
-            del self.cache[key]
-
-        logger.info(f"Evicted {len(entries_to_remove)} old cache entries")
+        return len(orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS))
 
     async def preload_common_configs(self, configs: List[Dict[str, Any]]) -> None:
         """Preload commonly audited configurations"""
 
-        for config in configs:
-            rules = config.get("rules", [])
-            intent = config.get("intent", "general security audit")
-
-            # Create mock audit result for preloading
-            mock_result = {
+        # Key hashing runs on the executor so large preloads don't stall the event loop
+        loop = asyncio.get_running_loop()
+        keys = await asyncio.gather(*(
+            loop.run_in_executor(
+                self.executor,
+                self.generate_key,
+                config.get("rules", []),
+                config.get("intent", "general security audit")
+            )
+            for config in configs
+        ))
+
+        # Create mock audit results for preloading and insert them in one pass
+        preloaded_at = datetime.utcnow().isoformat()
+        await self.mset({
+            key: {
                 "preloaded": True,
                 "config_name": config.get("name", "unknown"),
-                "rule_count": len(rules),
-                "timestamp": datetime.utcnow().isoformat()
+                "rule_count": len(config.get("rules", [])),
+                "timestamp": preloaded_at
             }
+            for key, config in zip(keys, configs)
+        })
 
-            key = self.generate_key(rules, intent)
-            await self.set(key, mock_result)
-
-        logger.info(f"Preloaded {len(configs)} common configurations")
+        logger.info("Preloaded %d common configurations", len(configs))
 
     async def optimize_for_batch(self, batch_rules: List[List[Dict[str, Any]]], intent: str) -> Dict[str, Any]:
         """Optimize caching for batch audit operations"""
 
-        # Find common rule patterns across batch
-        common_patterns = self._find_common_patterns(batch_rules)
+        # Find common rule patterns across batch, off the event loop
+        loop = asyncio.get_running_loop()
+        common_patterns = await loop.run_in_executor(self.executor, self._find_common_patterns, batch_rules)
 
         # Pre-cache common sub-results
         optimization_stats = {
@@ -215,10 +274,9 @@ class ContextCache:
 
     def _hash_single_rule(self, rule: Dict[str, Any]) -> str:
         """Create hash for individual rule"""
-        rule_data = {
-            "direction": rule.get("direction", ""),
-            "action": rule.get("action", ""),
-            "protocols": sorted(rule.get("protocols", [])),
-            "ports": sorted(rule.get("ports", []))
-        }
-        return hashlib.md5(json.dumps(rule_data, sort_keys=True).encode()).hexdigest()
\ No newline at end of file
+        return _signature_digest((
+            rule.get("direction", ""),
+            rule.get("action", ""),
+            tuple(sorted(rule.get("protocols", []))),
+            tuple(sorted(rule.get("ports", [])))
+        ))
\ No newline at end of file
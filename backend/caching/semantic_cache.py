@@ -3,51 +3,238 @@ Semantic Cache - Vector-Based Recommendation Storage
 Stores approved fixes and retrieves similar recommendations using vector similarity
 """
 
+import asyncio
 import logging
+import math
+import os
+import threading
 import numpy as np
+import torch
 import json
 from typing import Dict, Any, List, Optional, Tuple, cast
 from datetime import datetime, timedelta
+from pathlib import Path
 from sentence_transformers import SentenceTransformer
 import faiss
+from cachetools import LRUCache
+
+from utils.dynamic_batcher import DynamicBatcher
+from utils.hashing import content_digest
 
 logger = logging.getLogger(__name__)
 
+# Quantized int8 weights published alongside the model for each non-torch backend
+_BACKEND_MODEL_FILES = {
+    "onnx": "onnx/model_qint8_avx512_vnni.onnx"
+}
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """CPUs allowed by the container's CFS quota (cgroup v2 cpu.max or v1 cfs_quota_us), if any"""
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()[:2]
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read_text())
+        period_us = int(Path("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read_text())
+        if quota_us > 0 and period_us > 0:
+            return max(1, math.ceil(quota_us / period_us))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _inference_threads() -> int:
+    """Threads for model inference: SEMANTIC_CACHE_THREADS, else the CPUs this container may use"""
+    configured = os.getenv("SEMANTIC_CACHE_THREADS")
+    if configured:
+        return max(1, int(configured))
+    # cpu_count() and the affinity mask report host cores; a CFS quota (docker --cpus) caps them further
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    quota = _cgroup_cpu_limit()
+    return min(cores, quota) if quota else cores
+
+
+_INFERENCE_THREADS = _inference_threads()
+
+
+def _backend_model_kwargs(backend: str, file_name: str) -> Dict[str, Any]:
+    """Model kwargs selecting the quantized weights and pinning the runtime's thread pool"""
+    kwargs: Dict[str, Any] = {"file_name": file_name}
+    if backend == "onnx":
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = _INFERENCE_THREADS
+        session_options.inter_op_num_threads = 1
+        kwargs["session_options"] = session_options
+    return kwargs
+
+
+def _load_embedding_model(model_name: str) -> SentenceTransformer:
+    """Load the model on the configured backend, falling back to FP32 PyTorch"""
+    backend = os.getenv("SEMANTIC_CACHE_BACKEND", "onnx").lower()
+    file_name = _BACKEND_MODEL_FILES.get(backend)
+    if file_name:
+        try:
+            return SentenceTransformer(
+                model_name, backend=backend, model_kwargs=_backend_model_kwargs(backend, file_name)
+            )
+        except Exception as e:
+            logger.warning("Could not load %s with the %s backend (%s); using PyTorch", model_name, backend, e)
+
+    # Torch's thread pools are process-wide, so this also sizes other torch models in the
+    # process (e.g. the RAG embedder); only applied when the cache actually runs on torch
+    torch.set_num_threads(_INFERENCE_THREADS)
+    try:
+        # Encodes are already batched, so parallelism comes from intra-op threads alone
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Can only be set before the first inter-op parallel work in the process
+        pass
+    return SentenceTransformer(model_name)
+
+
+# Past this many vectors the exhaustive flat index is swapped for IVF. IVF-Flat keeps
+# exact inner products, so the cosine thresholds below still hold; the threshold is
+# FAISS's minimum of 39 training points per centroid.
+_IVF_NLIST = 64
+_IVF_NPROBE = 8
+_IVF_MIN_ENTRIES = 39 * _IVF_NLIST
+
+# Feedback this close (cosine) to an existing entry updates it instead of adding a new one
+NEAR_DUPLICATE_THRESHOLD = 0.95
+
 class SemanticCache:
     """Semantic caching using vector similarity for firewall recommendations"""
 
     def __init__(self, model_name: str = "all-MiniLM-L6-v2", max_entries: int = 5000):
         self.model_name = model_name
-        self.model = SentenceTransformer(model_name)
+        self.model = _load_embedding_model(model_name)
         self.max_entries = max_entries
         self.entries: List[Dict[str, Any]] = []
-        self.vectors: Optional[np.ndarray[Any, np.dtype[np.floating[Any]]]] = None
+        self._entries_by_id: Dict[int, Dict[str, Any]] = {}
+        self._entries_by_key: Dict[str, Dict[str, Any]] = {}
+        self._next_id = 0
         self.index: Optional[faiss.Index] = None
+        # Searches run in worker threads; FAISS does not synchronize them with adds/removes
+        self._index_lock = threading.Lock()
+        self._upgrading = False
         self.embedding_dim = self.model.get_sentence_embedding_dimension()
+        # Row i holds the unit vector of self.entries[i]; one spare row covers the insert that triggers eviction
+        self.vectors: np.ndarray[Any, np.dtype[np.float32]] = np.empty(
+            (max_entries + 1, self.embedding_dim), dtype=np.float32
+        )
+        self.n = 0
+        # Concurrent lookups and stores share one batched transformer forward
+        self._encoder: DynamicBatcher[str, np.ndarray] = DynamicBatcher(
+            self._encode_batch, max_batch_size=32, max_wait_ms=5.0
+        )
+
+        # Semantic text behind each generated key, and its embedding once computed
+        self._key_texts: LRUCache[str, str] = LRUCache(maxsize=1024)
+        self._key_embeddings: LRUCache[str, np.ndarray] = LRUCache(maxsize=1024)
 
         # Initialize FAISS index
         self._initialize_index()
 
+    def warm_up(self) -> None:
+        """Run one throwaway embedding and search so the first request skips lazy model/index setup"""
+        try:
+            vector = self._encode(["warmup"])
+            self._search(vector, 1)
+            logger.info("Semantic cache embedding model warmed up")
+        except Exception as e:
+            logger.error("Semantic cache warm-up failed: %s", e)
+
     def _initialize_index(self):
         """Initialize FAISS vector index"""
-        self.index = faiss.IndexFlatIP(self.embedding_dim)  # Inner product for cosine similarity
+        # Inner product over unit vectors = cosine; the ID map lets eviction remove vectors in place
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(self.embedding_dim))
+        self.index_type = "flat"
+
+    async def _maybe_upgrade_index(self) -> None:
+        """Switch to a trained IVF index once a growing flat index crosses the size threshold"""
+        if self.index_type != "flat" or self._upgrading or len(self.entries) < _IVF_MIN_ENTRIES:
+            return
+
+        self._upgrading = True
+        try:
+            # Train on a snapshot in a worker thread; entries added meanwhile are picked up by the rebuild
+            index = await asyncio.to_thread(self._train_ivf_index, self.vectors[:self.n].copy())
+            self._rebuild_index(index)
+            logger.info("Semantic cache index upgraded to IVF at %d entries", len(self.entries))
+        except Exception as e:
+            logger.error("Failed to upgrade semantic cache index: %s", e)
+        finally:
+            self._upgrading = False
+
+    def _train_ivf_index(self, vectors: np.ndarray[Any, np.dtype[np.float32]]) -> faiss.Index:
+        """Train an empty IVF-Flat inner-product index on the given unit vectors"""
+        quantizer = faiss.IndexFlatIP(self.embedding_dim)
+        index = faiss.IndexIVFFlat(quantizer, self.embedding_dim, _IVF_NLIST, faiss.METRIC_INNER_PRODUCT)
+        index.train(vectors)
+        index.nprobe = _IVF_NPROBE
+        return index
+
+    def _add_entry(self, entry: Dict[str, Any], vector: np.ndarray[Any, np.dtype[np.float32]]) -> None:
+        """Assign an entry its index ID and add its unit vector to the index"""
+        entry["id"] = self._next_id
+        self._next_id += 1
+        self.entries.append(entry)
+        self._entries_by_id[entry["id"]] = entry
+        self._entries_by_key[entry["key"]] = entry
+
+        self.vectors[self.n] = vector[0]
+        self.n += 1
+
+        with self._index_lock:
+            if self.index is not None:
+                self.index.add_with_ids(self.vectors[self.n - 1:self.n], np.array([entry["id"]], dtype=np.int64))
+
+    def _encode(self, texts: List[str]) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """Embed texts in one model call as L2-normalized float32 rows"""
+        embeddings = np.ascontiguousarray(
+            self.model.encode(texts, batch_size=32, convert_to_numpy=True), dtype=np.float32
+        )
+        # Normalized once here, so inner product downstream is cosine with no per-query division
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    async def _encode_batch(self, texts: List[str]) -> List[np.ndarray[Any, np.dtype[np.float32]]]:
+        """Embed a batch of texts in a single model call"""
+        return list(await asyncio.to_thread(self._encode, texts))
+
+    async def _embed(self, text: str) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """Embed one text, batched with any other embeddings requested concurrently"""
+        return await self._encoder.submit(text)
+
+    def _search(self, query_vector: np.ndarray[Any, np.dtype[np.float32]], k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Search the index for the k nearest entry IDs"""
+        with self._index_lock:
+            if self.index is None:
+                return np.empty((1, 0), dtype=np.float32), np.empty((1, 0), dtype=np.int64)
+            return self.index.search(query_vector, k=k)
+
+    @staticmethod
+    def _as_matrix(vector: np.ndarray[Any, np.dtype[np.float32]]) -> np.ndarray[Any, np.dtype[np.float32]]:
+        """View one unit vector as the single-row matrix FAISS expects"""
+        return vector.reshape(1, -1)
 
     def generate_key(self, intent: str, rules: List[Dict[str, Any]]) -> str:
         """Generate semantic key from intent and rule patterns"""
 
-        # Create semantic representation
-        intent_embedding = self.model.encode(intent)
-
         # Extract key patterns from rules
         rule_patterns = self._extract_rule_patterns(rules)
-        pattern_text = " ".join(rule_patterns)
-
-        # Combine intent and patterns
-        semantic_text = f"{intent} {pattern_text}"
-        semantic_embedding = self.model.encode(semantic_text)
 
         # Convert to hash for storage key
-        import hashlib
         key_data = {
             "intent": intent,
             "patterns": rule_patterns,
@@ -55,7 +242,11 @@ class SemanticCache:
         }
 
         key_string = json.dumps(key_data, sort_keys=True)
-        return hashlib.sha256(key_string.encode()).hexdigest()
+        key = content_digest(key_string)
+
+        # Remember what the key means so get/set embed the intent, not the hash
+        self._key_texts[key] = f"{intent} {' '.join(rule_patterns)}"
+        return key
 
     async def get(self, key: str, similarity_threshold: float = 0.85) -> Optional[List[Dict[str, Any]]]:
         """Retrieve semantically similar recommendations"""
@@ -64,24 +255,25 @@ class SemanticCache:
             return None
 
         # Generate embedding for the query
-        query_embedding = self._generate_embedding_from_key(key)
+        query_embedding = await self._key_embedding(key)
         if query_embedding is None:
             return None
 
         # Search for similar entries
-        query_vector = np.array([query_embedding], dtype=np.float32)
-        scores, indices = self.index.search(query_vector, k=5)  # Top 5 similar
+        query_vector = self._as_matrix(query_embedding)
+        scores, indices = await asyncio.to_thread(self._search, query_vector, 5)  # Top 5 similar
 
         # Filter by similarity threshold
         similar_entries = []
         for score, idx in zip(scores[0], indices[0]):
-            if score >= similarity_threshold and idx < len(self.entries):
-                entry = self.entries[idx]
+            entry = self._entries_by_id.get(int(idx))
+            if score >= similarity_threshold and entry is not None:
                 entry["similarity_score"] = float(score)
                 similar_entries.append(entry)
 
         if similar_entries:
-            logger.info(f"Found {len(similar_entries)} semantically similar recommendations")
+            logger.info("Found %d semantically similar recommendations", len(similar_entries))
+            self._touch(similar_entries[0])
             # Type cast since dict access returns Any
             return cast(List[Dict[str, Any]], similar_entries[0]["recommendations"])
 
@@ -91,9 +283,9 @@ class SemanticCache:
         """Store recommendations with semantic embedding"""
 
         # Generate embedding for storage
-        embedding = self._generate_embedding_from_key(key)
+        embedding = await self._key_embedding(key)
         if embedding is None:
-            logger.warning(f"Could not generate embedding for key {key[:8]}...")
+            logger.warning("Could not generate embedding for key %.8s...", key)
             return
 
         # Create entry
@@ -101,34 +293,26 @@ class SemanticCache:
             "key": key,
             "recommendations": recommendations,
             "timestamp": datetime.utcnow().isoformat(),
+            "last_used": datetime.utcnow().isoformat(),
             "usage_count": 0
         }
 
-        # Add to entries
-        self.entries.append(entry)
-
-        # Add to vector index
-        vector = np.array([embedding], dtype=np.float32)
-        if self.vectors is None:
-            self.vectors = vector
-        else:
-            self.vectors = np.vstack([self.vectors, vector])
-
-        if self.index is not None:
-            self.index.add(vector)
+        # Add to entries and vector index
+        self._add_entry(entry, self._as_matrix(embedding))
+        await self._maybe_upgrade_index()
 
         # Maintain size limit
         if len(self.entries) > self.max_entries:
             await self._evict_old_entries()
 
-        logger.info(f"Stored semantic recommendations for key {key[:8]}...")
+        logger.info("Stored semantic recommendations for key %.8s...", key)
 
     async def update_usage(self, key: str) -> None:
         """Update usage statistics for a cached entry"""
-        for entry in self.entries:
-            if entry["key"] == key:
-                entry["usage_count"] += 1
-                break
+        entry = self._entries_by_key.get(key)
+        if entry is not None:
+            entry["usage_count"] += 1
+            self._touch(entry)
 
     async def get_stats(self) -> Dict[str, Any]:
         """Get semantic cache statistics"""
@@ -154,6 +338,11 @@ class SemanticCache:
             "model_name": self.model_name
         }
     
+    @staticmethod
+    def _touch(entry: Dict[str, Any]) -> None:
+        """Mark an entry as recently used so LRU eviction keeps it"""
+        entry["last_used"] = datetime.utcnow().isoformat()
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the embedding model"""
         return {
@@ -164,22 +353,26 @@ class SemanticCache:
             "model_loaded": self.model is not None
         }
 
-    def _generate_embedding_from_key(self, key: str) -> Optional[np.ndarray[Any, np.dtype[np.floating[Any]]]]:
-        """Generate embedding from semantic key"""
+    async def _key_embedding(self, key: str) -> Optional[np.ndarray[Any, np.dtype[np.float32]]]:
+        """Embed the intent and rule patterns a key was generated from, once per key"""
 
-        try:
-            # The key contains JSON data that we can use to recreate the semantic content
-            # For now, we'll use the key itself as the semantic content
-            # In a real implementation, you'd decode the key to get intent and patterns
+        embedding = self._key_embeddings.get(key)
+        if embedding is not None:
+            return embedding
 
-            # Simple approach: use the key as text for embedding
-            embedding = self.model.encode(key)
-            return np.array(embedding, dtype=np.float32)
+        text = self._key_texts.get(key)
+        if text is None:
+            return None
 
+        try:
+            embedding = await self._embed(text)
         except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
+            logger.error("Failed to generate embedding: %s", e)
             return None
 
+        self._key_embeddings[key] = embedding
+        return embedding
+
     def _extract_rule_patterns(self, rules: List[Dict[str, Any]]) -> List[str]:
         """Extract semantic patterns from rules"""
 
@@ -203,46 +396,56 @@ class SemanticCache:
         return patterns
 
     async def _evict_old_entries(self, keep_percent: float = 0.9) -> None:
-        """Evict least-used entries to maintain size limit"""
+        """Evict least-recently-used entries to maintain size limit"""
 
         if len(self.entries) <= self.max_entries:
             return
 
-        # Sort by usage count (ascending) then by timestamp (oldest first)
-        sorted_entries = sorted(
-            self.entries,
-            key=lambda x: (x["usage_count"], datetime.fromisoformat(x["timestamp"]))
+        # LRU order (oldest first), with approved feedback outranking plain entries
+        order = sorted(
+            range(len(self.entries)),
+            key=lambda i: (
+                self.entries[i].get("feedback_approved", False),
+                self.entries[i].get("last_used", self.entries[i]["timestamp"])
+            )
         )
 
-        # Keep the most used entries
-        keep_count = int(len(sorted_entries) * keep_percent)
-        entries_to_keep = sorted_entries[-keep_count:]
-
-        # Rebuild index with kept entries
-        self.entries = entries_to_keep
-        self._rebuild_index()
-
-        logger.info(f"Evicted {len(sorted_entries) - keep_count} semantic cache entries")
+        # Keep the most recently used entries
+        evict_count = len(order) - int(len(order) * keep_percent)
+        evicted = [self.entries[i] for i in order[:evict_count]]
+        kept_rows = order[evict_count:]
+        self.entries = [self.entries[i] for i in kept_rows]
+
+        # Compact the kept vectors to the front of the buffer in their new entry order
+        self.n = len(kept_rows)
+        self.vectors[:self.n] = self.vectors[kept_rows]
+
+        # Drop the evicted vectors from the index; the kept ones stay as they are
+        evicted_ids = np.array([entry["id"] for entry in evicted], dtype=np.int64)
+        for entry in evicted:
+            del self._entries_by_id[entry["id"]]
+            # A key stored twice maps to its newest entry; only drop the mapping if it is this one
+            if self._entries_by_key.get(entry["key"]) is entry:
+                del self._entries_by_key[entry["key"]]
+        with self._index_lock:
+            if self.index is not None:
+                self.index.remove_ids(evicted_ids)
 
-    def _rebuild_index(self) -> None:
-        """Rebuild the FAISS index with current entries"""
+        logger.info("Evicted %d semantic cache entries", evict_count)
 
-        if not self.entries:
-            self._initialize_index()
-            return
+    def _rebuild_index(self, trained_index: Optional[faiss.Index] = None) -> None:
+        """Rebuild the FAISS index from the stored entry vectors, into a trained IVF index if given"""
 
-        # Generate embeddings for all entries
-        embeddings = []
-        for entry in self.entries:
-            embedding = self._generate_embedding_from_key(entry["key"])
-            if embedding is not None:
-                embeddings.append(embedding)
+        with self._index_lock:
+            if trained_index is None:
+                self._initialize_index()
+            else:
+                self.index = trained_index
+                self.index_type = "ivf"
 
-        if embeddings:
-            self.vectors = np.array(embeddings, dtype=np.float32)
-            self.index = faiss.IndexFlatIP(self.embedding_dim)
-            if self.index is not None:
-                self.index.add(self.vectors)
+            if self.entries and self.index is not None:
+                ids = np.array([entry["id"] for entry in self.entries], dtype=np.int64)
+                self.index.add_with_ids(self.vectors[:self.n], ids)
 
     async def find_similar_issues(self, issue_description: str, limit: int = 5) -> List[Dict[str, Any]]:
         """Find similar historical issues and their resolutions"""
@@ -251,16 +454,18 @@ class SemanticCache:
             return []
 
         # Embed the issue description
-        issue_embedding = self.model.encode(issue_description)
-        query_vector = np.array([issue_embedding], dtype=np.float32)
+        issue_embedding = await self._embed(issue_description)
+        query_vector = self._as_matrix(issue_embedding)
 
         # Search for similar issues
-        scores, indices = self.index.search(query_vector, k=limit)
+        scores, indices = await asyncio.to_thread(self._search, query_vector, limit)
 
         similar_issues = []
         for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.entries):
-                entry = self.entries[idx].copy()
+            cached = self._entries_by_id.get(int(idx))
+            if cached is not None:
+                self._touch(cached)
+                entry = cached.copy()
                 entry["similarity_score"] = float(score)
                 similar_issues.append(entry)
 
@@ -269,6 +474,22 @@ class SemanticCache:
     async def learn_from_feedback(self, original_issue: str, approved_fix: Dict[str, Any]) -> None:
         """Learn from user feedback to improve future recommendations"""
 
+        embedding = await self._embed(original_issue)
+        vector = self._as_matrix(embedding)
+
+        # A near-identical issue already cached: refresh it rather than growing the index
+        if self.index is not None and self.index.ntotal > 0:
+            scores, indices = await asyncio.to_thread(self._search, vector, 1)
+            entry = self._entries_by_id.get(int(indices[0][0]))
+            if scores[0][0] > NEAR_DUPLICATE_THRESHOLD and entry is not None:
+                entry["recommendations"] = [approved_fix]
+                entry["timestamp"] = datetime.utcnow().isoformat()
+                entry["usage_count"] = max(entry["usage_count"], 100)
+                self._touch(entry)
+                entry["feedback_approved"] = True
+                logger.info("Updated near-duplicate semantic cache entry from user feedback")
+                return
+
         # Store the approved fix with high priority
         key = f"approved_fix_{hash(original_issue)}"
 
@@ -277,22 +498,16 @@ class SemanticCache:
             "key": key,
             "recommendations": [approved_fix],
             "timestamp": datetime.utcnow().isoformat(),
+            "last_used": datetime.utcnow().isoformat(),
             "usage_count": 100,  # High usage count to retain
             "feedback_approved": True
         }
 
-        self.entries.append(approved_entry)
+        self._add_entry(approved_entry, vector)
+        await self._maybe_upgrade_index()
 
-        # Rebuild index to include the new entry
-        embedding = self.model.encode(original_issue)
-        vector = np.array([embedding], dtype=np.float32)
-
-        if self.vectors is None:
-            self.vectors = vector
-        else:
-            self.vectors = np.vstack([self.vectors, vector])
-
-        if self.index is not None:
-            self.index.add(vector)
+        # Maintain size limit
+        if len(self.entries) > self.max_entries:
+            await self._evict_old_entries()
 
-        logger.info("Learned from user feedback and updated semantic cache")
\ No newline at end of file
+        logger.info("Learned from user feedback and updated semantic cache")
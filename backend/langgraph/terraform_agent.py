@@ -5,7 +5,7 @@ Uses LLM to intelligently parse and validate Terraform firewall configurations
 
 import logging
 import json
-from typing import Dict, List, Any, Optional, cast
+from typing import Dict, List, Any, Optional, Tuple, cast
 from pydantic import BaseModel
 
 from config.model_config import get_model_manager
@@ -13,6 +13,84 @@ from config.model_config import get_model_manager
 logger = logging.getLogger(__name__)
 
 
+# Request-independent part of the parsing prompt; kept free of interpolation so
+# it forms an identical prefix across calls
+_PARSING_INSTRUCTIONS = """You are an expert Terraform parser specializing in firewall configurations.
+
+**Task**: Parse the Terraform HCL code given at the end of this prompt and extract ALL firewall rules into a structured JSON format.
+
+**Output Requirements**:
+1. Return ONLY valid JSON (no markdown, no explanations)
+2. Each rule must have these fields:
+   - id (string): unique identifier
+   - name (string): rule name
+   - description (string): rule description
+   - cloud_provider (string): the provider named at the end of this prompt
+   - direction (string): "ingress" or "egress"
+   - action (string): "allow", "deny", or "redirect"
+   - priority (number): rule priority
+   - source_ranges (array of strings): source IP ranges or smart group IDs
+   - destination_ranges (array of strings): destination IP ranges or smart group IDs
+   - protocols (array of strings): protocols (tcp, udp, icmp, all)
+   - ports (array of strings): port ranges
+   - logging_enabled (boolean): whether logging is enabled
+   - provider_specific (object): any provider-specific fields
+
+3. Validate the rules and include:
+   - errors: List of critical issues that prevent parsing
+   - warnings: List of non-critical issues or recommendations
+   - metadata: Resource names, attachment points, etc.
+
+**Output JSON Format**:
+{
+  "rules": [
+    {
+      "id": "unique-id",
+      "name": "rule-name",
+      "description": "rule description",
+      "cloud_provider": "<provider>",
+      "direction": "ingress",
+      "action": "allow",
+      "priority": 0,
+      "source_ranges": ["10.0.0.0/8"],
+      "destination_ranges": ["192.168.0.0/16"],
+      "protocols": ["tcp"],
+      "ports": ["80", "443"],
+      "logging_enabled": true,
+      "provider_specific": {}
+    }
+  ],
+  "errors": [],
+  "warnings": [],
+  "metadata": {
+    "resource_names": [],
+    "total_rules": 0
+  }
+}
+"""
+
+_VALIDATION_INSTRUCTIONS = """You are a Terraform validation expert.
+
+**Task**: Validate the Terraform HCL code given at the end of this prompt for firewall rules of the named provider.
+
+**Check for**:
+1. Syntax errors
+2. Missing required fields
+3. Invalid values
+4. Security issues
+5. Best practice violations
+
+Return JSON with validation results:
+{
+  "valid": true/false,
+  "syntax_errors": [],
+  "missing_fields": [],
+  "security_issues": [],
+  "recommendations": []
+}
+"""
+
+
 class TerraformParseResult(BaseModel):
     """Result from Terraform parsing"""
     success: bool
@@ -104,8 +182,50 @@ class TerraformImportAgent:
         try:
             # Invoke LLM
             response = await self.llm.ainvoke(prompt)
-            
-            # Parse JSON response
+        except Exception as e:
+            logger.error("AI parsing error: %s", e)
+            return self._ai_parse_failure(e)
+
+        return self._result_from_response(response)
+
+    async def parse_terraform_batch(
+        self,
+        items: List[Tuple[str, str]]
+    ) -> List[TerraformParseResult]:
+        """
+        Parse several Terraform documents with a single batched LLM call
+        
+        Args:
+            items: (content, cloud_provider) pairs
+        
+        Returns:
+            One TerraformParseResult per item, in input order
+        """
+        if len(items) == 1:
+            return [await self.parse_terraform(*items[0])]
+
+        if not self.model_available:
+            return [await self._fallback_parse(content, provider) for content, provider in items]
+
+        try:
+            prompts = [self._build_parsing_prompt(content, provider) for content, provider in items]
+            responses = await self.llm.abatch(prompts, return_exceptions=True)
+        except Exception as e:
+            logger.error("Batched AI parsing failed: %s, falling back to regex", e)
+            return [await self._fallback_parse(content, provider) for content, provider in items]
+
+        results = []
+        for response in responses:
+            if isinstance(response, Exception):
+                logger.error("AI parsing error: %s", response)
+                results.append(self._ai_parse_failure(response))
+            else:
+                results.append(self._result_from_response(response))
+        return results
+
+    def _result_from_response(self, response: Any) -> TerraformParseResult:
+        """Build a parse result from a raw LLM response"""
+        try:
             result_data = self._extract_json_from_response(response)
             
             return TerraformParseResult(
@@ -117,83 +237,35 @@ class TerraformImportAgent:
             )
             
         except Exception as e:
-            logger.error(f"AI parsing error: {e}")
-            return TerraformParseResult(
-                success=False,
-                errors=[f"AI parsing failed: {str(e)}"]
-            )
+            logger.error("AI parsing error: %s", e)
+            return self._ai_parse_failure(e)
+
+    @staticmethod
+    def _ai_parse_failure(error: BaseException) -> TerraformParseResult:
+        return TerraformParseResult(
+            success=False,
+            errors=[f"AI parsing failed: {str(error)}"]
+        )
 
     def _build_parsing_prompt(self, content: str, cloud_provider: str) -> str:
         """Build the prompt for LLM-based parsing"""
         
+        # Static instructions first, then the per-provider patterns, then the
+        # request-specific payload last so providers can reuse the cached prefix
         schema_examples = self._get_provider_schema_examples(cloud_provider)
         
-        prompt = f"""You are an expert Terraform parser specializing in firewall configurations.
-
-**Task**: Parse the following Terraform HCL code and extract ALL firewall rules into a structured JSON format.
-
-**Provider**: {cloud_provider}
-
-**Output Requirements**:
-1. Return ONLY valid JSON (no markdown, no explanations)
-2. Each rule must have these fields:
-   - id (string): unique identifier
-   - name (string): rule name
-   - description (string): rule description
-   - cloud_provider (string): "{cloud_provider}"
-   - direction (string): "ingress" or "egress"
-   - action (string): "allow", "deny", or "redirect"
-   - priority (number): rule priority
-   - source_ranges (array of strings): source IP ranges or smart group IDs
-   - destination_ranges (array of strings): destination IP ranges or smart group IDs
-   - protocols (array of strings): protocols (tcp, udp, icmp, all)
-   - ports (array of strings): port ranges
-   - logging_enabled (boolean): whether logging is enabled
-   - provider_specific (object): any provider-specific fields
-
-3. Validate the rules and include:
-   - errors: List of critical issues that prevent parsing
-   - warnings: List of non-critical issues or recommendations
-   - metadata: Resource names, attachment points, etc.
-
+        return f"""{_PARSING_INSTRUCTIONS}
 **Provider-Specific Patterns**:
 {schema_examples}
 
+**Provider**: {cloud_provider}
+
 **Terraform HCL Code**:
 ```hcl
 {content}
 ```
 
-**Output JSON Format**:
-{{
-  "rules": [
-    {{
-      "id": "unique-id",
-      "name": "rule-name",
-      "description": "rule description",
-      "cloud_provider": "{cloud_provider}",
-      "direction": "ingress",
-      "action": "allow",
-      "priority": 0,
-      "source_ranges": ["10.0.0.0/8"],
-      "destination_ranges": ["192.168.0.0/16"],
-      "protocols": ["tcp"],
-      "ports": ["80", "443"],
-      "logging_enabled": true,
-      "provider_specific": {{}}
-    }}
-  ],
-  "errors": [],
-  "warnings": [],
-  "metadata": {{
-    "resource_names": [],
-    "total_rules": 0
-  }}
-}}
-
 Parse the code now and return ONLY the JSON output:"""
-        
-        return prompt
 
     def _get_provider_schema_examples(self, cloud_provider: str) -> str:
         """Get provider-specific schema examples"""
@@ -304,30 +376,13 @@ Parse the code now and return ONLY the JSON output:"""
                 "warnings": ["AI validation unavailable, using basic checks"]
             }
         
-        validation_prompt = f"""You are a Terraform validation expert.
-
-**Task**: Validate the following Terraform HCL code for {cloud_provider} firewall rules.
-
-**Check for**:
-1. Syntax errors
-2. Missing required fields
-3. Invalid values
-4. Security issues
-5. Best practice violations
+        validation_prompt = f"""{_VALIDATION_INSTRUCTIONS}
+**Provider**: {cloud_provider}
 
 **Terraform Code**:
 ```hcl
 {content}
-```
-
-Return JSON with validation results:
-{{
-  "valid": true/false,
-  "syntax_errors": [],
-  "missing_fields": [],
-  "security_issues": [],
-  "recommendations": []
-}}"""
+```"""
 
         try:
             response = await self.llm.ainvoke(validation_prompt)
@@ -2,10 +2,11 @@
 Document Ingester - Handles document ingestion from files and URLs
 """
 
+import csv
+import io
+import json
 import logging
-import os
-import tempfile
-from typing import Dict, Any, Optional, Tuple, cast
+from typing import BinaryIO, Dict, Any, Optional, Tuple, cast
 from pathlib import Path
 import requests
 from urllib.parse import urlparse
@@ -71,7 +72,48 @@ class DocumentIngester:
             'mime_type': mimetypes.guess_type(str(path))[0] or 'unknown'
         }
         
-        logger.info(f"Ingested file: {path.name} ({file_size} bytes)")
+        logger.info("Ingested file: %s (%d bytes)", path.name, file_size)
+        return title, content, metadata
+    
+    def ingest_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        title: Optional[str] = None
+    ) -> Tuple[str, str, Dict[str, Any]]:
+        """
+        Ingest a document from an open binary stream, such as an uploaded file,
+        without writing it to disk
+        
+        Returns:
+            Tuple of (title, content, metadata)
+        """
+        name = Path(filename)
+        
+        # Check extension
+        ext = name.suffix.lower()
+        if ext not in self.SUPPORTED_FILE_EXTENSIONS:
+            raise ValueError(f"Unsupported file type: {ext}")
+        
+        # Read at most one byte past the limit to detect oversized files
+        data = stream.read(self.max_file_size + 1)
+        if len(data) > self.max_file_size:
+            raise ValueError(f"File too large (max: {self.max_file_size / 1024 / 1024}MB)")
+        
+        # Extract title if not provided
+        if not title:
+            title = name.stem
+        
+        content = self._read_bytes(data, ext)
+        
+        metadata = {
+            'file_name': name.name,
+            'file_size': len(data),
+            'file_extension': ext,
+            'mime_type': mimetypes.guess_type(name.name)[0] or 'unknown'
+        }
+        
+        logger.info("Ingested upload: %s (%d bytes)", name.name, len(data))
         return title, content, metadata
     
     def ingest_url(
@@ -119,7 +161,7 @@ class DocumentIngester:
                 'status_code': response.status_code
             }
             
-            logger.info(f"Ingested URL: {url} ({content_length} bytes)")
+            logger.info("Ingested URL: %s (%d bytes)", url, content_length)
             return title, content, metadata
             
         except requests.RequestException as e:
@@ -127,63 +169,46 @@ class DocumentIngester:
     
     def _read_file(self, path: Path, ext: str) -> str:
         """Read file content based on extension"""
+        return self._read_bytes(path.read_bytes(), ext)
+    
+    def _read_bytes(self, data: bytes, ext: str) -> str:
+        """Extract text from raw file bytes based on extension"""
         
-        if ext in {'.txt', '.md', '.markdown', '.rst', '.html', '.htm'}:
-            # Text files
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
-        
-        elif ext == '.json':
-            import json
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return json.dumps(data, indent=2)
+        if ext == '.json':
+            return json.dumps(json.loads(data), indent=2)
         
         elif ext in {'.yaml', '.yml'}:
             try:
                 import yaml
-                with open(path, 'r', encoding='utf-8') as f:
-                    data = yaml.safe_load(f)
-                    return cast(str, yaml.dump(data, default_flow_style=False))
+                return cast(str, yaml.dump(yaml.safe_load(data), default_flow_style=False))
             except ImportError:
                 # Fallback to text reading
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
+                return data.decode('utf-8', errors='ignore')
         
         elif ext == '.csv':
-            import csv
-            content = []
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                reader = csv.reader(f)
-                for row in reader:
-                    content.append(', '.join(row))
-            return '\n'.join(content)
+            reader = csv.reader(io.StringIO(data.decode('utf-8', errors='ignore')))
+            return '\n'.join(', '.join(row) for row in reader)
         
         elif ext == '.pdf':
             try:
                 import PyPDF2
-                content = []
-                with open(path, 'rb') as f:
-                    pdf_reader = PyPDF2.PdfReader(f)
-                    for page in pdf_reader.pages:
-                        content.append(page.extract_text())
-                return '\n\n'.join(content)
+                pdf_reader = PyPDF2.PdfReader(io.BytesIO(data))
+                return '\n\n'.join(page.extract_text() for page in pdf_reader.pages)
             except ImportError:
                 raise ValueError("PyPDF2 required for PDF files. Install with: pip install PyPDF2")
         
         elif ext in {'.docx', '.doc'}:
             try:
                 from docx import Document as DocxDocument
-                doc = DocxDocument(path)
+                doc = DocxDocument(io.BytesIO(data))
                 paragraphs = [p.text for p in doc.paragraphs]
                 return '\n'.join(paragraphs)
             except ImportError:
                 raise ValueError("python-docx required for Word files. Install with: pip install python-docx")
         
         else:
-            # Fallback to text
-            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                return f.read()
+            # Text files and fallback
+            return data.decode('utf-8', errors='ignore')
     
     def _extract_content_from_response(
         self,
@@ -209,7 +234,6 @@ class DocumentIngester:
             # JSON content
             try:
                 data = response.json()
-                import json
                 return cast(str, json.dumps(data, indent=2))
             except:
                 return cast(str, response.text)
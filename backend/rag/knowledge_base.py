@@ -7,6 +7,7 @@ import logging
 import os
 import hashlib
 import json
+import threading
 from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from pathlib import Path
@@ -101,6 +102,11 @@ class RAGKnowledgeBase:
         self.vectors: Optional[np.ndarray] = None
         self.index: Optional[faiss.Index] = None
         
+        # Documents and chunk metadata are persisted as they change; the index is
+        # marked dirty and uploaded by flush_index, so writes are batched
+        self._index_dirty = False
+        self._index_lock = threading.Lock()
+        
         # Initialize FAISS index
         self._initialize_index()
         
@@ -185,28 +191,6 @@ class RAGKnowledgeBase:
         except Exception as e:
             logger.error(f"Failed to load from persistent storage: {e}", exc_info=True)
     
-    def _save_to_persistent_storage(self) -> None:
-        """Save FAISS index to persistent storage"""
-        if not self.persistent_storage or not self.index or self.vectors is None:
-            return
-        
-        try:
-            metadata = {
-                'embedding_dim': self.embedding_dim,
-                'chunk_count': len(self.chunks),
-                'document_count': len(self.documents),
-                'saved_at': datetime.utcnow().isoformat()
-            }
-            
-            self.persistent_storage.save_faiss_index(
-                self.index,
-                self.vectors,
-                metadata
-            )
-            logger.debug("Saved FAISS index to persistent storage")
-        except Exception as e:
-            logger.error(f"Failed to save to persistent storage: {e}", exc_info=True)
-    
     def _chunk_text(self, text: str) -> List[str]:
         """Split text into overlapping chunks"""
         if len(text) <= self.chunk_size:
@@ -290,13 +274,15 @@ class RAGKnowledgeBase:
         # Update FAISS index
         if new_vectors and self.index is not None:
             vectors_array = np.array(new_vectors, dtype=np.float32)
-            self.index.add(vectors_array)
-            
-            # Update vectors array
-            if self.vectors is None:
-                self.vectors = vectors_array
-            else:
-                self.vectors = np.vstack([self.vectors, vectors_array])
+            with self._index_lock:
+                self.index.add(vectors_array)
+                
+                # Update vectors array
+                if self.vectors is None:
+                    self.vectors = vectors_array
+                else:
+                    self.vectors = np.vstack([self.vectors, vectors_array])
+                self._index_dirty = True
         
         # Save to persistent storage
         if self.persistent_storage:
@@ -309,9 +295,6 @@ class RAGKnowledgeBase:
             # Save chunks metadata
             chunks_metadata = [chunk.to_dict() for chunk in new_chunks]
             self.persistent_storage.save_chunks_metadata(document_id, chunks_metadata)
-            
-            # Save FAISS index
-            self._save_to_persistent_storage()
         
         logger.info(f"Added document {document_id} with {len(new_chunks)} chunks")
         return document_id
@@ -341,11 +324,9 @@ class RAGKnowledgeBase:
             self.persistent_storage.delete_chunks_metadata(document_id)
         
         # Rebuild index (simpler than removing specific vectors)
-        self._rebuild_index()
-        
-        # Save updated index
-        if self.persistent_storage:
-            self._save_to_persistent_storage()
+        with self._index_lock:
+            self._rebuild_index()
+            self._index_dirty = True
         
         logger.info(f"Deleted document {document_id} and {len(chunks_to_remove)} chunks")
         return True
@@ -452,13 +433,39 @@ class RAGKnowledgeBase:
         
         return stats
     
+    def flush_index(self) -> bool:
+        """Upload the FAISS index if it changed since the last flush; returns whether it was saved"""
+        if not self.persistent_storage or not self._index_dirty:
+            return False
+        
+        # Snapshot under the lock so concurrent adds don't race the upload
+        with self._index_lock:
+            self._index_dirty = False
+            index, vectors = self.index, self.vectors
+            if index is not None:
+                index = faiss.clone_index(index)
+        
+        if index is None or vectors is None:
+            return False
+        
+        metadata = {
+            'embedding_dim': self.embedding_dim,
+            'chunk_count': index.ntotal,
+            'document_count': len(self.documents),
+            'saved_at': datetime.utcnow().isoformat()
+        }
+        if not self.persistent_storage.save_faiss_index(index, vectors, metadata):
+            self._index_dirty = True
+            return False
+        return True
+    
     def save_state(self) -> bool:
         """Explicitly save current state to persistent storage"""
         if not self.persistent_storage:
             return False
         
         try:
-            self._save_to_persistent_storage()
+            self.flush_index()
             return True
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
@@ -4,7 +4,7 @@ Telemetry Collector - Collects and stores application usage telemetry
 
 import logging
 import json
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from datetime import datetime, timedelta
 from collections import defaultdict
 import threading
@@ -93,17 +93,27 @@ class TelemetryCollector:
         limit: int = 1000
     ) -> List[Dict[str, Any]]:
         """Get events filtered by type and time range"""
+        return list(self.iter_events(event_type=event_type, hours=hours, limit=limit))
+    
+    def iter_events(
+        self,
+        event_type: Optional[str] = None,
+        hours: int = 24,
+        limit: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """Iterate over the newest matching events, oldest first, converting lazily"""
+        # Events are appended in time order, so scan back from the newest and stop
+        # at the cutoff or once enough events match (ISO timestamps sort as strings)
+        cutoff = (datetime.utcnow() - timedelta(hours=hours)).isoformat()
+        selected: List[TelemetryEvent] = []
         with self._lock:
-            cutoff_time = datetime.utcnow() - timedelta(hours=hours)
-            
-            filtered = [
-                event.to_dict()
-                for event in self._events
-                if (event_type is None or event.event_type == event_type)
-                and datetime.fromisoformat(event.timestamp) >= cutoff_time
-            ]
-            
-            return filtered[-limit:]
+            for event in reversed(self._events):
+                if (limit > 0 and len(selected) >= limit) or event.timestamp < cutoff:
+                    break
+                if event_type is None or event.event_type == event_type:
+                    selected.append(event)
+        
+        return (event.to_dict() for event in reversed(selected))
     
     def get_stats(self, hours: int = 24) -> Dict[str, Any]:
         """Get telemetry statistics"""
@@ -0,0 +1,91 @@
+"""Tests for the ASGI application entry point"""
+
+import base64
+import importlib
+import os
+
+import numpy as np
+import orjson
+import pytest
+
+import caching.semantic_cache as semantic_cache
+import rag.knowledge_base as knowledge_base
+
+
+class FakeModel:
+    """Stand-in embedding model so importing the app downloads no weights"""
+
+    def encode(self, texts, **kwargs):
+        count = len(texts) if isinstance(texts, list) else 1
+        return np.ones((count, 8), dtype=np.float32)
+
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+
+class TestAsgiApp:
+    """Test app.asgi_app serves requests"""
+
+    @pytest.fixture
+    def app_module(self, monkeypatch):
+        """Import app.py with the embedding models stubbed out"""
+        monkeypatch.setenv("SEMANTIC_CACHE_BACKEND", "torch")
+        monkeypatch.setattr(semantic_cache, "SentenceTransformer", lambda *args, **kwargs: FakeModel())
+        monkeypatch.setattr(knowledge_base, "SentenceTransformer", lambda *args, **kwargs: FakeModel())
+        return importlib.import_module("app")
+
+    @pytest.mark.asyncio
+    async def test_health_request(self, app_module):
+        """Test one request driven through the ASGI wrapper reaches Flask and returns its response"""
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/health",
+            "raw_path": b"/health",
+            "query_string": b"",
+            "root_path": "",
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 12345),
+            "server": ("testserver", 80),
+        }
+        messages = []
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            messages.append(message)
+
+        await app_module.asgi_app(scope, receive, send)
+
+        assert messages[0]["type"] == "http.response.start"
+        assert messages[0]["status"] == 200
+        body = b"".join(message.get("body", b"") for message in messages[1:])
+        assert orjson.loads(body)["status"] == "healthy"
+
+    def test_normalize_timestamps_match_provider_format(self, app_module):
+        """Test streamed normalized rules format datetimes like every other endpoint"""
+        credentials = f"{os.getenv('ADMIN_USERNAME', 'admin')}:{os.getenv('ADMIN_PASSWORD', 'admin')}"
+        headers = {"Authorization": "Basic " + base64.b64encode(credentials.encode()).decode()}
+        rule = {
+            "id": "r1",
+            "name": "r1",
+            "cloud_provider": "gcp",
+            "direction": "ingress",
+            "action": "allow",
+            "source_ranges": ["0.0.0.0/0"],
+            "protocols": ["tcp"],
+            "ports": ["22"]
+        }
+        client = app_module.app.test_client()
+
+        # The second request is served from the normalized rule cache
+        for _ in range(2):
+            response = client.post("/api/v1/rules/normalize", json={"rules": [rule]}, headers=headers)
+            assert response.status_code == 200
+            normalized = orjson.loads(response.get_data())["normalized_rules"][0]
+            assert normalized["normalization_timestamp"].endswith(" GMT")
+            assert normalized["original_rule"]["direction"] == "ingress"
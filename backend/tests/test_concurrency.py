@@ -0,0 +1,75 @@
+"""Tests for concurrency helpers"""
+
+import pytest
+import asyncio
+from utils.concurrency import LoopLocalSemaphore, SingleFlight
+
+
+class TestLoopLocalSemaphore:
+    """Test LoopLocalSemaphore functionality"""
+
+    async def test_limits_concurrency(self):
+        """Test no more than the configured number of holders run at once"""
+        semaphore = LoopLocalSemaphore(2)
+        active = 0
+        peak = 0
+
+        async def worker():
+            nonlocal active, peak
+            async with semaphore:
+                active += 1
+                peak = max(peak, active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        await asyncio.gather(*[worker() for _ in range(6)])
+
+        assert peak == 2
+
+    def test_usable_across_event_loops(self):
+        """Test the same instance works from separate event loops"""
+        semaphore = LoopLocalSemaphore(1)
+
+        async def use():
+            async with semaphore:
+                await asyncio.sleep(0)
+            return True
+
+        assert asyncio.run(use())
+        assert asyncio.run(use())
+
+
+class TestSingleFlight:
+    """Test SingleFlight functionality"""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Test callers with the same key get one shared result"""
+        flights = SingleFlight()
+        calls = []
+
+        async def work(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key.upper()
+
+        results = await asyncio.gather(
+            flights.run('a', lambda: work('a')),
+            flights.run('a', lambda: work('a')),
+            flights.run('b', lambda: work('b'))
+        )
+
+        assert results == ['A', 'A', 'B']
+        assert calls == ['a', 'b']
+
+    async def test_key_released_after_completion(self):
+        """Test a later call with the same key runs again"""
+        flights = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            return calls
+
+        assert await flights.run('k', work) == 1
+        assert await flights.run('k', work) == 2
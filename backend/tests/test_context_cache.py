@@ -46,6 +46,15 @@ class TestContextCache:
         result = await cache.get("nonexistent-key")
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_mset_and_mget(self, cache):
+        """Test bulk setting and getting preserves key order"""
+        await cache.mset({"key1": {"data": 1}, "key2": {"data": 2}})
+        
+        results = await cache.mget(["key2", "missing", "key1"])
+        
+        assert results == [{"data": 2}, None, {"data": 1}]
+
     @pytest.mark.asyncio
     async def test_clear_cache(self, cache):
         """Test clearing the cache"""
@@ -66,3 +75,53 @@ class TestContextCache:
         assert stats["entries"] == 1
         assert stats["max_size"] == 10
         assert "utilization_percent" in stats
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self, cache):
+        """Test a full cache drops the entry read least recently"""
+        for i in range(10):
+            await cache.set(f"key{i}", {"data": i})
+        await cache.get("key0")
+
+        await cache.set("key10", {"data": 10})
+
+        assert await cache.get("key1") is None
+        assert await cache.get("key0") == {"data": 0}
+        assert len(cache.cache) == 10
+
+    @pytest.mark.asyncio
+    async def test_preload_common_configs(self, cache):
+        """Test preloaded configs are retrievable by their generated keys"""
+        rules = [{"id": "rule-1", "direction": "ingress", "action": "allow"}]
+        await cache.preload_common_configs([{"name": "base", "rules": rules, "intent": "audit"}])
+
+        result = await cache.get(cache.generate_key(rules, "audit"))
+
+        assert result["preloaded"] is True
+        assert result["config_name"] == "base"
+
+    @pytest.mark.asyncio
+    async def test_evicts_to_byte_budget(self):
+        """Test entries are evicted once their total serialized size exceeds max_bytes"""
+        cache = ContextCache(max_size=10, ttl_hours=1, max_bytes=100)
+        await cache.set("key1", {"blob": "x" * 40})
+        await cache.set("key2", {"blob": "y" * 40})
+        await cache.set("key3", {"blob": "z" * 40})
+
+        assert await cache.get("key1") is None
+        assert await cache.get("key3") is not None
+        assert cache._total_bytes == sum(item["size"] for item in cache.cache.values())
+
+    @pytest.mark.asyncio
+    async def test_skips_entry_larger_than_byte_budget(self):
+        """Test an entry over max_bytes is not cached and does not flush the others"""
+        cache = ContextCache(max_size=10, ttl_hours=1, max_bytes=100)
+        await cache.set("key1", {"blob": "x" * 20})
+        await cache.set("key2", {"blob": "y" * 20})
+
+        await cache.set("huge", {"blob": "z" * 500})
+
+        assert await cache.get("huge") is None
+        assert await cache.get("key1") is not None
+        assert await cache.get("key2") is not None
+        assert cache._total_bytes <= cache.max_bytes
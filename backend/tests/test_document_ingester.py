@@ -0,0 +1,40 @@
+"""Tests for the document ingester"""
+
+import io
+import pytest
+from rag.document_ingester import DocumentIngester
+
+
+class TestDocumentIngester:
+    """Test DocumentIngester functionality"""
+
+    def test_ingest_stream_text(self):
+        """Test text uploads are read from the stream without touching disk"""
+        ingester = DocumentIngester()
+        title, content, metadata = ingester.ingest_stream(io.BytesIO(b"allow 443"), "policy.md")
+
+        assert title == "policy"
+        assert content == "allow 443"
+        assert metadata['file_size'] == 9
+        assert metadata['file_extension'] == '.md'
+
+    def test_ingest_stream_csv(self):
+        """Test CSV uploads are flattened to text"""
+        ingester = DocumentIngester()
+        _, content, _ = ingester.ingest_stream(io.BytesIO(b"a,b\nc,d\n"), "rules.csv", title="Rules")
+
+        assert content == "a, b\nc, d"
+
+    def test_ingest_stream_rejects_oversized(self):
+        """Test uploads over the size limit are rejected"""
+        ingester = DocumentIngester(max_file_size_mb=1)
+
+        with pytest.raises(ValueError):
+            ingester.ingest_stream(io.BytesIO(b"x" * (1024 * 1024 + 1)), "big.txt")
+
+    def test_ingest_stream_rejects_unsupported_type(self):
+        """Test unsupported extensions are rejected"""
+        ingester = DocumentIngester()
+
+        with pytest.raises(ValueError):
+            ingester.ingest_stream(io.BytesIO(b"\x00"), "payload.exe")
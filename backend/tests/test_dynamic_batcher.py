@@ -0,0 +1,34 @@
+"""Tests for the dynamic batcher"""
+
+import pytest
+import asyncio
+from utils.dynamic_batcher import DynamicBatcher
+
+
+class TestDynamicBatcher:
+    """Test DynamicBatcher functionality"""
+
+    async def test_coalesces_concurrent_calls(self):
+        """Test concurrent submissions are grouped up to the batch size"""
+        batch_sizes = []
+
+        async def handler(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = DynamicBatcher(handler, max_batch_size=4, max_wait_ms=10)
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+
+        assert results == [i * 2 for i in range(10)]
+        assert batch_sizes == [4, 4, 2]
+
+    async def test_handler_error_propagates(self):
+        """Test a failing batch raises for every caller"""
+
+        async def handler(items):
+            raise ValueError("boom")
+
+        batcher = DynamicBatcher(handler, max_batch_size=8, max_wait_ms=5)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+        assert all(isinstance(result, ValueError) for result in results)
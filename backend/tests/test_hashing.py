@@ -0,0 +1,27 @@
+"""Tests for hashing helpers"""
+
+from utils.hashing import content_digest, content_hasher
+
+
+class TestContentDigest:
+    """Test content_digest functionality"""
+
+    def test_str_and_bytes_match(self):
+        """Test str input is hashed as its UTF-8 encoding"""
+        assert content_digest('résumé') == content_digest('résumé'.encode('utf-8'))
+
+    def test_distinct_content_distinct_digest(self):
+        """Test different inputs give different 128-bit hex digests"""
+        first = content_digest(b'resource "a" {}')
+        second = content_digest(b'resource "b" {}')
+
+        assert first != second
+        assert len(first) == 32
+
+    def test_incremental_hasher_matches(self):
+        """Test content_hasher over chunks equals content_digest of the whole"""
+        hasher = content_hasher()
+        hasher.update(b'resource "a" ')
+        hasher.update(b'{}')
+
+        assert hasher.hexdigest() == content_digest(b'resource "a" {}')
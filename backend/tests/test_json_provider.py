@@ -0,0 +1,49 @@
+"""Tests for the orjson JSON provider"""
+
+import pytest
+from datetime import datetime
+from flask import Flask, jsonify, request
+from api.json_provider import OrjsonProvider, orjson_response
+
+
+class TestOrjsonProvider:
+    """Test OrjsonProvider functionality"""
+
+    @pytest.fixture
+    def app(self):
+        """Create an app using the orjson provider"""
+        app = Flask(__name__)
+        app.json = OrjsonProvider(app)
+        return app
+
+    def test_request_body_parsed_with_orjson(self, app, monkeypatch):
+        """Test request.get_json routes through the provider's loads"""
+        calls = []
+        original_loads = OrjsonProvider.loads
+
+        def tracking_loads(self, s, **kwargs):
+            calls.append(s)
+            return original_loads(self, s, **kwargs)
+
+        monkeypatch.setattr(OrjsonProvider, 'loads', tracking_loads)
+
+        with app.test_request_context(json={'content': 'resource "x" "y" {}', 'count': 2}):
+            assert request.get_json() == {'content': 'resource "x" "y" {}', 'count': 2}
+
+        assert len(calls) == 1
+
+    def test_jsonify_matches_default_format(self, app):
+        """Test sorted keys, non-string keys and HTTP-date datetimes"""
+        with app.app_context():
+            response = jsonify({'b': datetime(2024, 1, 1), 'a': 1, 2: 'x'})
+
+        assert response.get_data() == b'{"2":"x","a":1,"b":"Mon, 01 Jan 2024 00:00:00 GMT"}\n'
+
+    def test_orjson_response_keeps_order_and_datetime_format(self, app):
+        """Test orjson_response skips sorting but formats datetimes like jsonify"""
+        with app.app_context():
+            response = orjson_response({'b': datetime(2024, 1, 1), 'a': 1}, status=201)
+
+        assert response.status_code == 201
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == b'{"b":"Mon, 01 Jan 2024 00:00:00 GMT","a":1}'
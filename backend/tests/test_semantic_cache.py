@@ -0,0 +1,113 @@
+"""Tests for semantic cache"""
+
+import zlib
+
+import numpy as np
+import pytest
+
+import caching.semantic_cache as semantic_cache
+from caching.semantic_cache import SemanticCache
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer: one seeded random vector per text"""
+
+    dim = 64
+
+    def encode(self, texts, **kwargs):
+        return np.stack([
+            np.random.default_rng(zlib.crc32(text.encode())).standard_normal(self.dim).astype(np.float32)
+            for text in texts
+        ])
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+
+def unit(text):
+    """Expected stored vector for a text"""
+    vector = FakeModel().encode([text])[0]
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticCache:
+    """Test SemanticCache storage, eviction and index upgrade"""
+
+    @pytest.fixture(autouse=True)
+    def fake_model(self, monkeypatch):
+        """Replace the embedding model so no weights are downloaded"""
+        monkeypatch.setenv("SEMANTIC_CACHE_BACKEND", "torch")
+        monkeypatch.setattr(semantic_cache, "SentenceTransformer", lambda *args, **kwargs: FakeModel())
+
+    async def fill(self, cache, count, start=0):
+        """Store one entry per text, recording the text in its recommendations"""
+        keys = {}
+        for i in range(start, start + count):
+            text = f"allow tcp {i} from anywhere"
+            keys[text] = cache.generate_key(text, [])
+            await cache.set(keys[text], [{"text": text}])
+        return keys
+
+    def assert_consistent(self, cache):
+        """Vectors, FAISS index and lookup maps all describe exactly self.entries"""
+        assert cache.n == len(cache.entries)
+        assert cache.index.ntotal == len(cache.entries)
+        for row, entry in enumerate(cache.entries):
+            assert np.allclose(cache.vectors[row], unit(cache._key_texts[entry["key"]]), atol=1e-6)
+        assert set(cache._entries_by_id) == {entry["id"] for entry in cache.entries}
+        assert set(cache._entries_by_key) == {entry["key"] for entry in cache.entries}
+
+    @pytest.mark.asyncio
+    async def test_eviction_keeps_rows_index_and_maps_aligned(self):
+        """Test eviction compacts vectors in entry order and prunes the index and maps"""
+        cache = SemanticCache(max_entries=20)
+        keys = await self.fill(cache, 20)
+        # Recently used, so eviction keeps them and moves them behind the untouched entries
+        touched = list(keys.values())[:3]
+        for key in touched:
+            await cache.update_usage(key)
+        keys.update(await self.fill(cache, 1, start=20))
+
+        assert len(cache.entries) == 18
+        assert [entry["key"] for entry in cache.entries[-4:-1]] == touched
+        self.assert_consistent(cache)
+
+        evicted = [text for text, key in keys.items() if key not in cache._entries_by_key]
+        assert evicted
+        assert await cache.get(cache.generate_key(evicted[0], []), similarity_threshold=0.99) is None
+
+    @pytest.mark.asyncio
+    async def test_exact_match_lookup(self):
+        """Test a key generated from the same intent finds its own entry"""
+        cache = SemanticCache(max_entries=20)
+        await self.fill(cache, 25)
+
+        for entry in cache.entries[:5]:
+            text = entry["recommendations"][0]["text"]
+            result = await cache.get(cache.generate_key(text, []), similarity_threshold=0.99)
+            assert result == [{"text": text}]
+
+    @pytest.mark.asyncio
+    async def test_ivf_upgrade_then_eviction(self, monkeypatch):
+        """Test the trained IVF index stays consistent and exact across growth and eviction"""
+        monkeypatch.setattr(semantic_cache, "_IVF_MIN_ENTRIES", 100)
+        cache = SemanticCache(max_entries=150)
+        await self.fill(cache, 170)
+
+        assert cache.index_type == "ivf"
+        self.assert_consistent(cache)
+        for entry in cache.entries[::30]:
+            text = entry["recommendations"][0]["text"]
+            result = await cache.get(cache.generate_key(text, []), similarity_threshold=0.99)
+            assert result == [{"text": text}]
+
+    @pytest.mark.asyncio
+    async def test_update_usage_by_key(self):
+        """Test usage updates reach the entry stored under the key"""
+        cache = SemanticCache(max_entries=20)
+        keys = await self.fill(cache, 3)
+        key = next(iter(keys.values()))
+
+        await cache.update_usage(key)
+
+        assert cache._entries_by_key[key]["usage_count"] == 1
@@ -0,0 +1,73 @@
+"""Tests for the Terraform parser"""
+
+from utils.terraform_parser import canonicalize_hcl, dedupe_rules, parse_terraform_content
+
+
+class TestCanonicalizeHcl:
+    """Test canonicalize_hcl functionality"""
+
+    def test_ignores_comments_and_formatting(self):
+        """Test content differing only in comments and whitespace compares equal"""
+        original = 'resource "google_compute_firewall" "a" {  # ssh\n  name = "a"\n\n\n  /* note */ priority = 900\n}\n'
+        reformatted = '// header\nresource "google_compute_firewall" "a" {\nname = "a"\npriority = 900\n}'
+
+        assert canonicalize_hcl(original) == canonicalize_hcl(reformatted)
+
+    def test_keeps_comment_markers_inside_strings(self):
+        """Test quoted strings are never treated as comments"""
+        first = 'description = "allow # 22"'
+        second = 'description = "allow # 443"'
+
+        assert canonicalize_hcl(first) == first
+        assert canonicalize_hcl(first) != canonicalize_hcl(second)
+
+    def test_heredoc_content_unchanged(self):
+        """Test content with heredocs is left as is"""
+        content = 'script = <<EOF\n# not a comment\nEOF\n'
+
+        assert canonicalize_hcl(content) == content
+
+
+class TestParseTerraformContent:
+    """Test parse_terraform_content functionality"""
+
+    def test_parses_gcp_firewall(self):
+        """Test a GCP firewall resource is extracted"""
+        content = '''
+resource "google_compute_firewall" "allow_ssh" {
+  name = "allow-ssh"
+  priority = 900
+  source_ranges = ["0.0.0.0/0"]
+}
+'''
+        rules = parse_terraform_content(content, 'gcp')
+
+        assert len(rules) == 1
+        assert rules[0]['name'] == 'allow-ssh'
+        assert rules[0]['priority'] == 900
+        assert rules[0]['source_ranges'] == ['0.0.0.0/0']
+
+    def test_repeated_values_are_interned(self):
+        """Test equal small-domain values across rules share one string object"""
+        content = ''.join(
+            f'resource "google_compute_firewall" "r{i}" {{\n  direction = "INGRESS"\n  source_ranges = ["10.0.0.0/8"]\n}}\n'
+            for i in range(2)
+        )
+        rules = parse_terraform_content(content, 'gcp')
+
+        assert len(rules) == 2
+        assert rules[0]['direction'] is rules[1]['direction']
+        assert rules[0]['source_ranges'][0] is rules[1]['source_ranges'][0]
+
+
+class TestDedupeRules:
+    """Test dedupe_rules functionality"""
+
+    def test_drops_exact_duplicates_in_order(self):
+        """Test identical rules collapse to the first while distinct rules keep their order"""
+        ssh = {'name': 'ssh', 'ports': ['22'], 'source_ranges': ['0.0.0.0/0']}
+        web = {'name': 'web', 'ports': ['443'], 'source_ranges': ['0.0.0.0/0']}
+
+        assert dedupe_rules([ssh, web, dict(ssh), {'name': 'ssh', 'ports': ['2222'], 'source_ranges': ['0.0.0.0/0']}]) == [
+            ssh, web, {'name': 'ssh', 'ports': ['2222'], 'source_ranges': ['0.0.0.0/0']}
+        ]
@@ -0,0 +1,129 @@
+"""Tests for the user manager"""
+
+import hashlib
+import json
+
+import pytest
+from auth.user_manager import User, UserManager
+
+
+class TestPasswordHashing:
+    """Test UserManager password hashing"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a user manager backed by a temporary users file"""
+        manager = UserManager(storage_file=str(tmp_path / 'users.json'))
+        yield manager
+        manager.close()
+
+    def test_hash_round_trip(self, manager):
+        """Test a hashed password verifies and a wrong one does not"""
+        password_hash = manager._hash_password('s3cret')
+
+        assert manager._verify_password('s3cret', password_hash)
+        assert not manager._verify_password('wrong', password_hash)
+        assert password_hash.startswith('$argon2id')
+
+    def test_legacy_hash_verifies(self, manager):
+        """Test existing salted SHA-256 hashes still verify and are flagged for upgrade"""
+        legacy_hash = 'salt:' + hashlib.sha256(b's3cretsalt').hexdigest()
+
+        assert manager._verify_password('s3cret', legacy_hash)
+        assert not manager._verify_password('wrong', legacy_hash)
+        assert manager._needs_rehash(legacy_hash)
+
+    def test_login_upgrades_legacy_hash(self, manager):
+        """Test a successful login replaces a legacy hash with Argon2id"""
+        user = manager.create_user('gina', 'gina@example.com', 'pw')
+        user.password_hash = 'salt:' + hashlib.sha256(b'pwsalt').hexdigest()
+
+        assert manager.authenticate('gina', 'pw') is user
+        assert user.password_hash.startswith('$argon2id')
+        assert manager.authenticate('gina', 'pw') is user
+
+    def test_malformed_hash_rejected(self, manager):
+        """Test hashes without a separator or with non-hex digests never verify"""
+        assert not manager._verify_password('s3cret', 'no-separator')
+        assert not manager._verify_password('s3cret', 'salt:not-hex')
+
+
+class TestUserLookup:
+    """Test UserManager username and email indexes"""
+
+    @pytest.fixture
+    def manager(self, tmp_path):
+        """Create a user manager backed by a temporary users file"""
+        manager = UserManager(storage_file=str(tmp_path / 'users.json'))
+        yield manager
+        manager.close()
+
+    def test_lookups_follow_updates(self, manager):
+        """Test renamed users are found by their new username and email only"""
+        user = manager.create_user('alice', 'Alice@Example.com', 'pw')
+
+        assert manager.get_user_by_email('alice@example.com') is user
+        manager.update_user(user.user_id, username='alice2', email='alice2@example.com')
+
+        assert manager.get_user_by_username('alice') is None
+        assert manager.get_user_by_username('alice2') is user
+        assert manager.get_user_by_email('Alice@Example.com') is None
+        with pytest.raises(ValueError):
+            manager.create_user('bob', 'ALICE2@example.com', 'pw')
+
+    def test_authenticate(self, manager):
+        """Test login succeeds with the right password and fails otherwise"""
+        manager.create_user('carol', 'carol@example.com', 'pw')
+
+        assert manager.authenticate('carol', 'pw').username == 'carol'
+        assert manager.authenticate('carol', 'nope') is None
+        assert manager.authenticate('nobody', 'pw') is None
+
+    def test_login_save_is_deferred_until_flush(self, manager):
+        """Test last_login reaches storage on flush rather than on every login"""
+        manager.create_user('dave', 'dave@example.com', 'pw')
+        manager.authenticate('dave', 'pw')
+
+        def stored_last_login():
+            with open(manager.storage_file) as f:
+                users = json.load(f)['users']
+            return next(u['last_login'] for u in users if u['username'] == 'dave')
+
+        assert stored_last_login() is None
+        manager.flush()
+        assert stored_last_login() is not None
+
+    def test_last_login_round_trips(self):
+        """Test a stored last_login loads as a timestamp and reads back unchanged"""
+        user = User.from_dict({
+            'username': 'hank',
+            'email': 'hank@example.com',
+            'password_hash': 'x',
+            'last_login': '2024-05-01T12:34:56.123456'
+        })
+
+        assert isinstance(user._last_login, float)
+        assert user.last_login == '2024-05-01T12:34:56.123456'
+
+    def test_close_flushes_and_stops_thread(self, manager):
+        """Test close writes pending changes and stops the background flusher"""
+        manager.create_user('frank', 'frank@example.com', 'pw')
+        manager.authenticate('frank', 'pw')
+
+        manager.close()
+
+        assert not manager._dirty.is_set()
+        assert not manager._flush_thread.is_alive()
+
+    def test_stats_follow_updates(self, manager):
+        """Test role and active changes are reflected in get_stats"""
+        user = manager.create_user('erin', 'erin@example.com', 'pw', role='viewer')
+        assert manager.get_stats()['viewers'] == 1
+
+        manager.update_user(user.user_id, role='user', active=False)
+        stats = manager.get_stats()
+
+        assert stats['viewers'] == 0
+        assert stats['users'] == 0
+        assert stats['inactive_users'] == 1
+        assert stats['total_users'] == 2
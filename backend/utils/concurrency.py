@@ -0,0 +1,65 @@
+"""
+Concurrency helpers.
+Process-wide limits for async work that may run on more than one event loop.
+"""
+
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar('T')
+
+
+class LoopLocalSemaphore:
+    """
+    An ``asyncio.Semaphore`` that can be declared at module scope.
+
+    asyncio primitives bind to the first loop that waits on them. Under the
+    ASGI server every request shares one loop, but the development server and
+    test client run each async view on a fresh loop, so one semaphore is kept
+    per running loop.
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = weakref.WeakKeyDictionary()
+
+    def _get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.value)
+        return semaphore
+
+    async def __aenter__(self) -> None:
+        await self._get().acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._get().release()
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls that share a key into one execution.
+
+    The first caller for a key starts ``factory()`` as a task; callers arriving
+    while it runs await the same task and get the same result or exception.
+    The key is released as soon as the task finishes. In-flight tasks are
+    tracked per event loop, like ``LoopLocalSemaphore``.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Hashable, asyncio.Task]]' = weakref.WeakKeyDictionary()
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable[T]]) -> T:
+        loop = asyncio.get_running_loop()
+        inflight = self._inflight.get(loop)
+        if inflight is None:
+            inflight = self._inflight[loop] = {}
+
+        task = inflight.get(key)
+        if task is None:
+            task = inflight[key] = loop.create_task(factory())
+            task.add_done_callback(lambda _: inflight.pop(key, None))
+        # Shielded so one caller going away does not cancel the shared call
+        return await asyncio.shield(task)
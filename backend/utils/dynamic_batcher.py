@@ -0,0 +1,89 @@
+"""
+Dynamic request batcher.
+Coalesces concurrent async calls arriving within a short window into one batched call.
+"""
+
+import asyncio
+import logging
+import weakref
+from typing import Any, Awaitable, Callable, Generic, List, Optional, Set, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+
+class _PendingBatch:
+    """Items waiting to be flushed on one event loop"""
+
+    def __init__(self) -> None:
+        self.entries: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class DynamicBatcher(Generic[T, R]):
+    """
+    Collect items submitted concurrently and hand them to ``handler`` as one list.
+
+    A batch is flushed when it reaches ``max_batch_size`` items or ``max_wait_ms``
+    after its first item arrived, whichever comes first. ``handler`` must return
+    one result per item, in order.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Awaitable[List[R]]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 20.0
+    ):
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        # Batches are tracked per event loop so futures never cross loops
+        self._pending: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingBatch]' = weakref.WeakKeyDictionary()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, item: T) -> R:
+        """Queue an item and wait for its result"""
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is None:
+            batch = self._pending[loop] = _PendingBatch()
+
+        future = loop.create_future()
+        batch.entries.append((item, future))
+
+        if len(batch.entries) >= self.max_batch_size:
+            self._flush(loop)
+        elif batch.timer is None:
+            batch.timer = loop.call_later(self.max_wait, self._flush, loop)
+
+        return await future
+
+    def _flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._pending.pop(loop, None)
+        if batch is None or not batch.entries:
+            return
+        if batch.timer is not None:
+            batch.timer.cancel()
+        task = loop.create_task(self._run(batch.entries))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, entries: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in entries]
+        try:
+            results = await self.handler(items)
+            if len(results) != len(items):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            logger.error("Batched call failed for %d items: %s", len(items), e)
+            for _, future in entries:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(entries, results):
+            if not future.done():
+                future.set_result(result)
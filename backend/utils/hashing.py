@@ -0,0 +1,39 @@
+"""
+Hashing helpers.
+Fast digests for cache keys and deduplication, where only identity matters.
+"""
+
+import hashlib
+from typing import Any, Union
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+
+def content_digest(data: Union[bytes, str]) -> str:
+    """
+    Return a 128-bit hex digest of ``data`` for use as a cache or dedup key.
+
+    Uses xxh3 when xxhash is installed and BLAKE2b otherwise. Not suitable for
+    anything security-sensitive such as passwords or signatures.
+    """
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def content_hasher() -> Any:
+    """
+    Return an incremental hasher producing the same digests as ``content_digest``.
+
+    Feed it with ``update(bytes)`` and finish with ``hexdigest()``, to hash
+    content piece by piece without concatenating it first.
+    """
+    if XXHASH_AVAILABLE:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
@@ -4,10 +4,64 @@ Extracts firewall rules from Terraform configurations.
 """
 
 import re
+import sys
+import os
 import json
-from typing import List, Dict, Any, Optional
+import mmap
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
 from pathlib import Path
 
+import orjson
+
+from utils.hashing import content_digest
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on files read at once when parsing a directory synchronously
+_MAX_READ_WORKERS = 16
+
+# Patterns are compiled once at import. Each resource parser first checks for its
+# resource type as a plain substring, so files without it skip the regex scan.
+_GCP_FIREWALL_RE = re.compile(r'resource\s+"google_compute_firewall"\s+"([^"]+)"\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}', re.DOTALL)
+_AZURE_NSG_RULE_RE = re.compile(r'resource\s+"azurerm_network_security_rule"\s+"([^"]+)"\s*\{([^}]+)\}', re.DOTALL)
+_DCF_RULESET_RE = re.compile(r'resource\s+"aviatrix_dcf_ruleset"\s+"([^"]+)"\s*\{', re.DOTALL)
+_DCF_RULES_BLOCK_RE = re.compile(r'rules\s*\{', re.DOTALL)
+_LEGACY_AVIATRIX_RE = re.compile(r'resource\s+"aviatrix_firewall(?:_policy)?"\s+"([^"]+)"\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}', re.DOTALL)
+_POLICY_BLOCK_RE = re.compile(r'policy\s*\{([^}]+)\}', re.DOTALL)
+_GENERIC_RESOURCE_RES = tuple(
+    re.compile(pattern, re.DOTALL | re.IGNORECASE)
+    for pattern in (
+        r'resource\s+"[^"]*firewall[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
+        r'resource\s+"[^"]*security[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
+        r'resource\s+"[^"]*rule[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
+    )
+)
+_ALLOW_DENY_BLOCK_RE = re.compile(r'(allow|deny)\s*\{([^}]+)\}', re.DOTALL)
+_PORT_RANGES_BLOCK_RE = re.compile(r'port_ranges\s*\{([^}]+)\}', re.DOTALL)
+_BRACE_RE = re.compile(r'[{}]')
+# Quoted strings are matched first so comment markers inside them are kept
+_HCL_CANONICAL_RE = re.compile(r'("(?:[^"\\\n]|\\.)*")|(?:\s|#[^\n]*|//[^\n]*|/\*.*?\*/)+', re.DOTALL)
+
+# Small-domain rule fields repeat across thousands of rules; their values are interned
+_INTERNED_VALUE_FIELDS = ('cloud_provider', 'direction', 'action')
+_INTERNED_LIST_FIELDS = ('source_ranges', 'destination_ranges', 'protocols', 'ports')
+
+
+@lru_cache(maxsize=64)
+def _value_patterns(key: str) -> Tuple[Pattern[str], Pattern[str]]:
+    """Compiled quoted and bare ``key = value`` patterns for an attribute name."""
+    return re.compile(rf'{key}\s*=\s*"([^"]*)"'), re.compile(rf'{key}\s*=\s*([^\s\n]+)')
+
+
+@lru_cache(maxsize=64)
+def _list_pattern(key: str) -> Pattern[str]:
+    """Compiled ``key = [...]`` pattern for an attribute name."""
+    return re.compile(rf'{key}\s*=\s*\[([^\]]*)\]')
+
 
 def parse_terraform_content(content: str, cloud_provider: str = 'aviatrix') -> List[Dict[str, Any]]:
     """
@@ -20,31 +74,56 @@ def parse_terraform_content(content: str, cloud_provider: str = 'aviatrix') -> L
     Returns:
         List of parsed firewall rules
     """
-    import logging
-    logger = logging.getLogger(__name__)
-    
-    rules = []
-    
     logger.info(f"Parsing Terraform content for provider: {cloud_provider}, content length: {len(content)}")
     
-    # Parse based on provider
-    if cloud_provider == 'gcp':
-        rules.extend(_parse_gcp_firewall_rules(content))
-    elif cloud_provider == 'azure':
-        rules.extend(_parse_azure_nsg_rules(content))
-    elif cloud_provider == 'aviatrix':
-        rules.extend(_parse_aviatrix_rules(content))
-    elif cloud_provider in ['cisco', 'palo_alto']:
-        rules.extend(_parse_generic_firewall_rules(content, cloud_provider))
+    # Parse based on provider; cisco, palo_alto and unknown providers use generic parsing
+    parser = _PROVIDER_PARSERS.get(cloud_provider)
+    if parser is not None:
+        rules = parser(content)
     else:
-        # Try generic parsing
-        rules.extend(_parse_generic_firewall_rules(content, cloud_provider))
+        rules = _parse_generic_firewall_rules(content, cloud_provider)
+    
+    _intern_rule_fields(rules)
     
     logger.info(f"Parsed {len(rules)} rules from Terraform content")
     
     return rules
 
 
+def _intern_rule_fields(rules: List[Dict[str, Any]]) -> None:
+    """Intern repeated string values in place so duplicates share one object."""
+    intern = sys.intern
+    for rule in rules:
+        for field in _INTERNED_VALUE_FIELDS:
+            value = rule.get(field)
+            if type(value) is str:
+                rule[field] = intern(value)
+        for field in _INTERNED_LIST_FIELDS:
+            values = rule.get(field)
+            if values:
+                rule[field] = [intern(v) if type(v) is str else v for v in values]
+
+
+def canonicalize_hcl(content: str) -> str:
+    """
+    Reduce HCL content to a canonical form for cache keys.
+    
+    Comments are dropped and whitespace runs collapse to a single space, or a
+    single newline when they span lines, so submissions differing only in
+    formatting or comments compare equal. Quoted strings are left untouched.
+    Content with heredocs is returned as is, since their bodies are free text.
+    """
+    if '<<' in content:
+        return content
+    
+    def replace(match: 're.Match[str]') -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        return '\n' if '\n' in match.group() else ' '
+    
+    return _HCL_CANONICAL_RE.sub(replace, content).strip()
+
+
 def parse_terraform_directory(directory_path: str, cloud_provider: str = 'aviatrix') -> List[Dict[str, Any]]:
     """
     Parse all Terraform files in a directory.
@@ -56,35 +135,115 @@ def parse_terraform_directory(directory_path: str, cloud_provider: str = 'aviatr
     Returns:
         List of parsed firewall rules from all files
     """
-    all_rules = []
+    tf_files = _find_terraform_files(directory_path)
+    if not tf_files:
+        return []
+    
+    # File reads overlap in a small thread pool; map keeps rules in file order
+    with ThreadPoolExecutor(max_workers=min(_MAX_READ_WORKERS, len(tf_files))) as pool:
+        per_file = pool.map(lambda tf_file: _parse_terraform_file(tf_file, cloud_provider), tf_files)
+        return dedupe_rules(rule for rules in per_file for rule in rules)
+
+
+async def parse_terraform_directory_async(directory_path: str, cloud_provider: str = 'aviatrix') -> List[Dict[str, Any]]:
+    """
+    Parse all Terraform files in a directory without blocking the event loop.
+    
+    The directory walk and each file's read and parse run in worker threads,
+    with files processed concurrently. Rules are returned in file order.
+    
+    Args:
+        directory_path: Path to directory containing .tf files
+        cloud_provider: Target cloud provider
+    
+    Returns:
+        List of parsed firewall rules from all files
+    """
+    tf_files = await asyncio.to_thread(_find_terraform_files, directory_path)
+    per_file = await asyncio.gather(
+        *(asyncio.to_thread(_parse_terraform_file, tf_file, cloud_provider) for tf_file in tf_files)
+    )
+    return dedupe_rules(rule for rules in per_file for rule in rules)
+
+
+def dedupe_rules(rules: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop exact duplicate rules, keeping the first occurrence in order.
+    
+    Copy-pasted modules yield identical rule dicts across files. Only exact
+    duplicates are dropped; rules are not merged or reordered, since rule
+    identity and evaluation order matter to the audit.
+    """
+    seen = set()
+    unique = []
+    for rule in rules:
+        digest = content_digest(orjson.dumps(rule, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS))
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(rule)
+    return unique
+
+
+def _find_terraform_files(directory_path: str) -> List[Path]:
+    """Find all .tf files under a directory, depth-first without following directory symlinks."""
     dir_path = Path(directory_path)
     
     if not dir_path.exists() or not dir_path.is_dir():
         raise ValueError(f"Directory not found: {directory_path}")
     
-    # Find all .tf files
-    tf_files = list(dir_path.rglob("*.tf"))
-    
-    for tf_file in tf_files:
-        try:
-            content = tf_file.read_text(encoding='utf-8')
-            rules = parse_terraform_content(content, cloud_provider)
-            all_rules.extend(rules)
-        except Exception as e:
-            print(f"Error parsing {tf_file}: {e}")
-            continue
-    
-    return all_rules
+    files: List[Path] = []
+    _scan_terraform_dir(str(dir_path), files)
+    return files
+
+
+def _scan_terraform_dir(path: str, files: List[Path]) -> None:
+    """Collect .tf files under ``path``, using the file type cached on each DirEntry instead of a stat."""
+    try:
+        with os.scandir(path) as entries_it:
+            entries = list(entries_it)
+    except PermissionError:
+        return
+    
+    subdirs = []
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+        elif entry.name.endswith('.tf') and entry.is_file():
+            files.append(Path(entry.path))
+    
+    for subdir in subdirs:
+        _scan_terraform_dir(subdir, files)
+
+
+def _read_terraform_file(tf_file: Path) -> str:
+    """Decode a Terraform file straight from a read-only memory map of the page cache."""
+    with open(tf_file, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return str(mapped, 'utf-8')
+
+
+def _parse_terraform_file(tf_file: Path, cloud_provider: str) -> List[Dict[str, Any]]:
+    """Read and parse a single Terraform file, returning no rules on error."""
+    try:
+        content = _read_terraform_file(tf_file)
+        return parse_terraform_content(content, cloud_provider)
+    except Exception as e:
+        logger.error("Error parsing %s: %s", tf_file, e)
+        return []
 
 
 def _parse_gcp_firewall_rules(content: str) -> List[Dict[str, Any]]:
     """Parse GCP compute firewall rules from Terraform."""
     rules = []
     
-    # Pattern to match google_compute_firewall resources
-    pattern = r'resource\s+"google_compute_firewall"\s+"([^"]+)"\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}'
+    if 'google_compute_firewall' not in content:
+        return rules
     
-    matches = re.finditer(pattern, content, re.DOTALL)
+    # Match google_compute_firewall resources
+    matches = _GCP_FIREWALL_RE.finditer(content)
     
     for match in matches:
         resource_name = match.group(1)
@@ -117,10 +276,11 @@ def _parse_azure_nsg_rules(content: str) -> List[Dict[str, Any]]:
     """Parse Azure NSG rules from Terraform."""
     rules = []
     
-    # Pattern for azurerm_network_security_rule
-    pattern = r'resource\s+"azurerm_network_security_rule"\s+"([^"]+)"\s*\{([^}]+)\}'
+    if 'azurerm_network_security_rule' not in content:
+        return rules
     
-    matches = re.finditer(pattern, content, re.DOTALL)
+    # Match azurerm_network_security_rule resources
+    matches = _AZURE_NSG_RULE_RE.finditer(content)
     
     for match in matches:
         resource_name = match.group(1)
@@ -147,14 +307,14 @@ def _parse_azure_nsg_rules(content: str) -> List[Dict[str, Any]]:
 
 def _parse_aviatrix_rules(content: str) -> List[Dict[str, Any]]:
     """Parse Aviatrix firewall rules from Terraform."""
-    import logging
-    logger = logging.getLogger(__name__)
     rules = []
     
-    # Pattern for aviatrix_dcf_ruleset resources (new DCF format)
-    # Use a simpler pattern and extract the resource body by counting braces
-    resource_pattern = r'resource\s+"aviatrix_dcf_ruleset"\s+"([^"]+)"\s*\{'
-    resource_matches = list(re.finditer(resource_pattern, content, re.DOTALL))
+    if 'aviatrix_' not in content:
+        return rules
+    
+    # Find aviatrix_dcf_ruleset resources (new DCF format) and extract each
+    # resource body by counting braces
+    resource_matches = list(_DCF_RULESET_RE.finditer(content))
     
     logger.info(f"Found {len(resource_matches)} aviatrix_dcf_ruleset resources")
     
@@ -162,48 +322,31 @@ def _parse_aviatrix_rules(content: str) -> List[Dict[str, Any]]:
         resource_name = res_match.group(1)
         start_pos = res_match.end()
         
-        # Find matching closing brace by counting
-        brace_count = 1
-        pos = start_pos
-        while pos < len(content) and brace_count > 0:
-            if content[pos] == '{':
-                brace_count += 1
-            elif content[pos] == '}':
-                brace_count -= 1
-            pos += 1
-        
-        if brace_count != 0:
+        # Find matching closing brace
+        end_pos = _find_block_end(content, start_pos)
+        if end_pos is None:
             logger.warning(f"Could not find matching braces for resource {resource_name}")
             continue
             
-        resource_body = content[start_pos:pos-1]
+        resource_body = content[start_pos:end_pos]
         logger.info(f"Found aviatrix_dcf_ruleset resource: {resource_name}, body length: {len(resource_body)}")
         
         ruleset_name = _extract_value(resource_body, 'name') or resource_name
         
         # Extract rules blocks from DCF ruleset using brace counting
-        rules_pattern = r'rules\s*\{'
-        rules_matches = list(re.finditer(rules_pattern, resource_body, re.DOTALL))
+        rules_matches = list(_DCF_RULES_BLOCK_RE.finditer(resource_body))
         logger.info(f"Found {len(rules_matches)} rules blocks in resource {resource_name}")
         
         for rule_match_idx, rule_match in enumerate(rules_matches):
             rule_start = rule_match.end()
             
             # Find matching closing brace for this rules block
-            brace_count = 1
-            rule_pos = rule_start
-            while rule_pos < len(resource_body) and brace_count > 0:
-                if resource_body[rule_pos] == '{':
-                    brace_count += 1
-                elif resource_body[rule_pos] == '}':
-                    brace_count -= 1
-                rule_pos += 1
-            
-            if brace_count != 0:
+            rule_end = _find_block_end(resource_body, rule_start)
+            if rule_end is None:
                 logger.warning(f"Could not find matching braces for rules block {rule_match_idx}")
                 continue
                 
-            rule_body = resource_body[rule_start:rule_pos-1]
+            rule_body = resource_body[rule_start:rule_end]
             logger.debug(f"Extracted rule body length: {len(rule_body)}")
             
             # Extract action and map to standard format
@@ -256,16 +399,14 @@ def _parse_aviatrix_rules(content: str) -> List[Dict[str, Any]]:
             rules.append(rule)
     
     # Also parse legacy aviatrix_firewall resources
-    legacy_pattern = r'resource\s+"aviatrix_firewall(?:_policy)?"\s+"([^"]+)"\s*\{([^}]+(?:\{[^}]*\}[^}]*)*)\}'
-    legacy_matches = re.finditer(legacy_pattern, content, re.DOTALL)
+    legacy_matches = _LEGACY_AVIATRIX_RE.finditer(content) if 'aviatrix_firewall' in content else ()
     
     for match in legacy_matches:
         resource_name = match.group(1)
         resource_body = match.group(2)
         
         # Extract policy blocks
-        policy_pattern = r'policy\s*\{([^}]+)\}'
-        policy_matches = re.finditer(policy_pattern, resource_body, re.DOTALL)
+        policy_matches = _POLICY_BLOCK_RE.finditer(resource_body)
         
         for policy_match in policy_matches:
             policy_body = policy_match.group(1)
@@ -294,14 +435,8 @@ def _parse_generic_firewall_rules(content: str, cloud_provider: str) -> List[Dic
     rules = []
     
     # Look for common resource patterns
-    patterns = [
-        r'resource\s+"[^"]*firewall[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
-        r'resource\s+"[^"]*security[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
-        r'resource\s+"[^"]*rule[^"]*"\s+"([^"]+)"\s*\{([^}]+)\}',
-    ]
-    
-    for pattern in patterns:
-        matches = re.finditer(pattern, content, re.DOTALL | re.IGNORECASE)
+    for pattern in _GENERIC_RESOURCE_RES:
+        matches = pattern.finditer(content)
         
         for match in matches:
             resource_name = match.group(1)
@@ -325,16 +460,41 @@ def _parse_generic_firewall_rules(content: str, cloud_provider: str) -> List[Dic
     return rules
 
 
+def _find_block_end(content: str, start: int) -> Optional[int]:
+    """
+    Return the index of the brace closing a block whose body starts at ``start``.
+    
+    Jumps between brace characters with a compiled regex instead of stepping
+    through every character. Returns None if the block is never closed.
+    """
+    depth = 1
+    for match in _BRACE_RE.finditer(content, start):
+        if match.group() == '{':
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return match.start()
+    return None
+
+
+# Provider-specific parsers, looked up once per call instead of an if/elif chain
+_PROVIDER_PARSERS: Dict[str, Callable[[str], List[Dict[str, Any]]]] = {
+    'gcp': _parse_gcp_firewall_rules,
+    'azure': _parse_azure_nsg_rules,
+    'aviatrix': _parse_aviatrix_rules,
+}
+
+
 def _extract_value(content: str, key: str) -> Optional[str]:
     """Extract a single value from HCL content."""
-    pattern = rf'{key}\s*=\s*"([^"]*)"'
-    match = re.search(pattern, content)
+    quoted, bare = _value_patterns(key)
+    match = quoted.search(content)
     if match:
         return match.group(1)
     
     # Try without quotes (for booleans, numbers)
-    pattern = rf'{key}\s*=\s*([^\s\n]+)'
-    match = re.search(pattern, content)
+    match = bare.search(content)
     if match:
         return match.group(1).strip()
     
@@ -343,8 +503,7 @@ def _extract_value(content: str, key: str) -> Optional[str]:
 
 def _extract_list(content: str, key: str) -> List[str]:
     """Extract a list value from HCL content."""
-    pattern = rf'{key}\s*=\s*\[([^\]]*)\]'
-    match = re.search(pattern, content)
+    match = _list_pattern(key).search(content)
     if match:
         items = match.group(1)
         # Remove quotes and whitespace, split by comma
@@ -357,8 +516,7 @@ def _extract_protocols_gcp(content: str) -> List[str]:
     protocols = []
     
     # Look for allow/deny blocks
-    allow_deny_pattern = r'(allow|deny)\s*\{([^}]+)\}'
-    matches = re.finditer(allow_deny_pattern, content, re.DOTALL)
+    matches = _ALLOW_DENY_BLOCK_RE.finditer(content)
     
     for match in matches:
         block_content = match.group(2)
@@ -374,8 +532,7 @@ def _extract_ports_gcp(content: str) -> List[str]:
     ports = []
     
     # Look for allow/deny blocks
-    allow_deny_pattern = r'(allow|deny)\s*\{([^}]+)\}'
-    matches = re.finditer(allow_deny_pattern, content, re.DOTALL)
+    matches = _ALLOW_DENY_BLOCK_RE.finditer(content)
     
     for match in matches:
         block_content = match.group(2)
@@ -411,8 +568,7 @@ def _extract_dcf_port_ranges(content: str) -> List[str]:
     ports = []
     
     # Look for port_ranges blocks
-    port_ranges_pattern = r'port_ranges\s*\{([^}]+)\}'
-    matches = re.finditer(port_ranges_pattern, content, re.DOTALL)
+    matches = _PORT_RANGES_BLOCK_RE.finditer(content)
     
     for match in matches:
         range_body = match.group(1)